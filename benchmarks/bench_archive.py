@@ -0,0 +1,71 @@
+# Archive previews from the zip central directory and tar headers, versus
+# reading the whole file once. The zip has many small entries and one large
+# one, the tar a single large member.
+#
+#   python benchmarks/bench_archive.py --entries 20000 --size-mb 1024
+
+import argparse
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from previews import extract_archive_preview
+
+
+class Zeros(io.RawIOBase):
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        buffer[:] = bytes(len(buffer))
+        return len(buffer)
+
+
+def read_all(path):
+    with open(path, "rb") as f:
+        while f.read(1024 * 1024):
+            pass
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    print(f"{label:<28}{(time.perf_counter() - start) * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "many.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            for i in range(args.entries):
+                archive.writestr(f"photos/{i:06d}.jpg", b"x" * 256)
+            with archive.open("disk.img", "w", force_zip64=True) as member:
+                chunk = bytes(1024 * 1024)
+                for _ in range(args.size_mb):
+                    member.write(chunk)
+        tar_path = os.path.join(tmp, "large.tar")
+        with tarfile.open(tar_path, "w") as archive:
+            info = tarfile.TarInfo("disk.img")
+            info.size = args.size_mb * 1024 * 1024
+            archive.addfile(info, Zeros())
+
+        print(f"{args.entries} small entries and a {args.size_mb} MB one in the zip, {args.size_mb} MB in the tar")
+        timed("zip preview", lambda: extract_archive_preview(zip_path))
+        timed("zip read whole file", lambda: read_all(zip_path))
+        timed("tar preview", lambda: extract_archive_preview(tar_path))
+        timed("tar read whole file", lambda: read_all(tar_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Peak memory and per-image latency of the old full-resolution QPixmap path
+# versus scaled-on-decode loading. Each mode runs in its own process so the
+# peak RSS figures don't contaminate each other.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_decode.py --images 20
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_jpegs, peak_rss_mb, percentile
+
+
+def run_mode(mode, directory):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtWidgets import QApplication
+
+    from imaging import load_scaled_image
+
+    app = QApplication(sys.argv)
+    baseline = peak_rss_mb()
+    timings = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        start = time.perf_counter()
+        if mode == "full":
+            pixmap = QPixmap(path)
+            preview = pixmap.scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            preview = load_scaled_image(path)
+        assert not preview.isNull(), path
+        timings.append(time.perf_counter() - start)
+    print(json.dumps({
+        "mode": mode,
+        "images": len(timings),
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": percentile(timings, 0.5) * 1000,
+        "max_ms": max(timings) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+        "baseline_rss_mb": baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--mode", choices=["generate", "full", "scaled"])
+    parser.add_argument("--dir")
+    args = parser.parse_args()
+
+    if args.mode == "generate":
+        from PyQt5.QtWidgets import QApplication
+
+        app = QApplication(sys.argv)
+        make_jpegs(args.dir, args.images, args.width, args.height)
+        return
+    if args.mode:
+        run_mode(args.mode, args.dir)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "Desktop")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", "generate", "--dir", directory,
+             "--images", str(args.images), "--width", str(args.width), "--height", str(args.height)],
+            check=True,
+        )
+        for mode in ("full", "scaled"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--dir", directory],
+                check=True, stdout=subprocess.PIPE, universal_newlines=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"{result['mode']:>6}: {result['mean_ms']:7.1f} ms/image mean, "
+                f"{result['p50_ms']:7.1f} ms p50, {result['max_ms']:7.1f} ms max, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MB (baseline {result['baseline_rss_mb']:.0f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
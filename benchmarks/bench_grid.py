@@ -0,0 +1,81 @@
+# Grid mode over a large desktop: frame times while scrolling from top to
+# bottom, and how long the visible cells take to get their thumbnails after a
+# jump, cold and then from the thumbnail cache.
+#
+#   python benchmarks/bench_grid.py --small-files 20000 --jpegs 200
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic import isolated_home, make_small_files, make_jpegs, percentile, wait_for_scan
+
+
+def visible_thumbnails(app, window, timeout=30):
+    # Seconds until every image cell on screen has its thumbnail.
+    grid = window.grid
+    model = window.grid_model
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        app.processEvents()
+        viewport = grid.viewport().rect()
+        missing = [path for row, path in enumerate(model.paths)
+                   if path.endswith(".jpg") and path not in model.thumbnails
+                   and grid.visualRect(model.index(row)).intersects(viewport)]
+        if not missing:
+            return time.perf_counter() - start
+    raise TimeoutError("thumbnails did not load")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small-files", type=int, default=20000)
+    parser.add_argument("--jpegs", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        desktop = isolated_home(tmp)
+        make_small_files(desktop, args.small_files)
+        make_jpegs(desktop, args.jpegs, 3000, 2000)
+
+        import main as app_main
+
+        for run in ("cold", "cached"):
+            window = app_main.MainWindow("name", watch=False, grid=True)
+            window.resize(1200, 900)
+            window.show()
+            wait_for_scan(app, window)
+            model = window.grid_model
+            print(f"{run}: {model.rowCount()} cells")
+
+            # The JPEGs sort first; jump past them and back.
+            bar = window.grid.verticalScrollBar()
+            bar.setValue(bar.maximum())
+            app.processEvents()
+            bar.setValue(0)
+            print(f"  thumbnails on screen after a jump  {visible_thumbnails(app, window) * 1000:8.1f} ms")
+
+            frames = []
+            step = max(bar.maximum() // args.frames, 1)
+            for value in range(0, bar.maximum() + 1, step):
+                start = time.perf_counter()
+                bar.setValue(value)
+                window.grid.viewport().repaint()
+                frames.append(time.perf_counter() - start)
+                app.processEvents()
+            print(f"  scroll frame  p50 {percentile(frames, 0.5) * 1000:6.1f} ms  "
+                  f"p99 {percentile(frames, 0.99) * 1000:6.1f} ms  max {max(frames) * 1000:6.1f} ms")
+            window.close()
+
+
+if __name__ == "__main__":
+    main()
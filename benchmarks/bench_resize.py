@@ -0,0 +1,60 @@
+# Frame times while the main window is continuously resized with a large
+# queue loaded, plus a check that the button stylesheets stay the same size.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_resize.py --files 5000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+from synthetic import isolated_home, make_small_files, percentile, pump, wait_for_scan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        desktop = isolated_home(tmp)
+        make_small_files(desktop, args.files)
+
+        from main import MainWindow
+
+        window = MainWindow(watch=False)
+        window.show()
+        wait_for_scan(app, window)
+        print(f"queued files: {len(window.current_files)}, cards: {window.stack.count()}")
+
+        stylesheet_before = len(window.discard_button.styleSheet())
+        width, height = 900, 700
+        frames = []
+        for i in range(args.frames):
+            # Sweep back and forth like a user dragging the window edge.
+            step = i % 200 if (i // 200) % 2 == 0 else 200 - i % 200
+            start = time.perf_counter()
+            window.resize(width + step * 2, height + step)
+            app.processEvents()
+            frames.append(time.perf_counter() - start)
+        # Let the debounced layout pass run once the drag stops.
+        pump(app, 0.2)
+        stylesheet_after = len(window.discard_button.styleSheet())
+
+        print(f"frames: {len(frames)}")
+        print(f"frame time p50: {percentile(frames, 0.5) * 1000:.2f} ms")
+        print(f"frame time p99: {percentile(frames, 0.99) * 1000:.2f} ms")
+        print(f"frame time max: {max(frames) * 1000:.2f} ms")
+        print(f"discard button stylesheet: {stylesheet_before} -> {stylesheet_after} chars")
+        window.close()
+
+
+if __name__ == "__main__":
+    main()
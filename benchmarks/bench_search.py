@@ -0,0 +1,70 @@
+# Query latency of the search index over a synthetic desktop of text files,
+# including the queue split MainWindow.apply_search does with the result.
+#
+#   python benchmarks/bench_search.py --files 10000
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from textindex import SearchIndex, index_file, tokenize
+
+WORDS = [
+    "invoice", "receipt", "contract", "meeting", "notes", "budget", "report", "draft", "final", "summary",
+    "project", "travel", "booking", "payment", "salary", "tax", "insurance", "lease", "agenda", "minutes",
+]
+
+
+def make_files(directory, count, words_per_file, seed):
+    # A few topic words per file plus a long tail of made-up ones, so the
+    # vocabulary grows with the number of files the way real documents do.
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        topics = rng.sample(WORDS, 2)
+        words = [rng.choice(topics) if rng.random() < 0.05 else f"w{rng.randrange(count * 10)}"
+                 for _ in range(words_per_file)]
+        path = os.path.join(directory, f"{rng.choice(WORDS)}_{i:05d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(" ".join(words))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(tmp, args.files, args.words, args.seed)
+        index = SearchIndex()
+        start = time.perf_counter()
+        for path in paths:
+            index.add(path, tokenize(os.path.basename(path)))
+            index.extend(*index_file(path))
+        index.sort_vocabulary()
+        build = time.perf_counter() - start
+
+    print(f"{args.files} files, {len(index.postings)} distinct words, indexed in {build:.2f}s (one process)")
+    queue = list(paths)
+    for query in ("invoice", "inv", "invoice tax", "w12", "final report budget", "nothingmatches"):
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            matches = index.search(query)
+            current = [path for path in queue if path in matches]
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{query!r:<24}{len(current):>7} matches  p50 {timings[10] * 1000:6.1f} ms  max {timings[-1] * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Time-to-first-card: from interpreter start to the first FileCard being the
+# current page of the stack. Each run is a fresh process against the same
+# synthetic desktop; the first run also starts with an empty thumbnail cache.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_startup.py --files 5000 --runs 5
+
+import time
+
+PROCESS_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+def measure(order):
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    import_start = time.perf_counter()
+    from main import MainWindow
+    imported = time.perf_counter()
+    backends_imported = "fitz" in sys.modules or "docx" in sys.modules
+
+    window = MainWindow(order, watch=False)
+    window.show()
+    deadline = time.perf_counter() + 60
+    while window.first_card_at is None and time.perf_counter() < deadline:
+        app.processEvents()
+    result = {
+        "import_main_ms": (imported - import_start) * 1000,
+        "time_to_first_card_ms": (window.first_card_at - PROCESS_START) * 1000,
+        "window_to_first_card_ms": (window.first_card_at - window.started_at) * 1000,
+        "backends_imported_by_main": backends_imported,
+    }
+    window.close()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--order", help="pass --order through to MainWindow, e.g. largest")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.order)
+        return
+
+    from synthetic import isolated_home, make_small_files
+
+    with tempfile.TemporaryDirectory() as tmp:
+        desktop = isolated_home(tmp)
+        make_small_files(desktop, args.files)
+        command = [sys.executable, os.path.abspath(__file__), "--child"]
+        if args.order:
+            command += ["--order", args.order]
+        results = []
+        for _ in range(args.runs):
+            out = subprocess.run(command, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+    ttfc = sorted(r["time_to_first_card_ms"] for r in results)
+    print(f"{args.files} files, {args.runs} runs, order={args.order or 'directory'}")
+    print(f"time to first card: median {ttfc[len(ttfc) // 2]:.0f} ms, min {ttfc[0]:.0f} ms, max {ttfc[-1]:.0f} ms")
+    print(f"import main: median {sorted(r['import_main_ms'] for r in results)[len(results) // 2]:.0f} ms")
+    print(f"window created -> first card: median {sorted(r['window_to_first_card_ms'] for r in results)[len(results) // 2]:.0f} ms")
+    print(f"PyMuPDF/python-docx imported by main: {any(r['backends_imported_by_main'] for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
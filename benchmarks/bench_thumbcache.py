@@ -0,0 +1,52 @@
+# Cold vs warm preview rendering through the on-disk thumbnail cache.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_thumbcache.py --images 50
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+from main import render_preview
+from thumbcache import ThumbnailCache
+from synthetic import make_jpegs
+
+
+def render_all(paths, cache_directory):
+    # A fresh ThumbnailCache per pass mimics a new launch: nothing is held in
+    # memory, only what is on disk.
+    cache = ThumbnailCache(cache_directory)
+    start = time.perf_counter()
+    for path in paths:
+        kind, _ = render_preview(path, cache)
+        assert kind == "image", path
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_jpegs(os.path.join(tmp, "Desktop"), args.images, args.width, args.height)
+        cache_directory = os.path.join(tmp, "cache")
+        cold = render_all(paths, cache_directory)
+        warm = render_all(paths, cache_directory)
+
+    print(f"{args.images} images at {args.width}x{args.height}")
+    print(f"cold: {cold:.3f}s total, {cold / args.images * 1000:.1f} ms/image")
+    print(f"warm: {warm:.3f}s total, {warm / args.images * 1000:.1f} ms/image")
+    print(f"speedup: {cold / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
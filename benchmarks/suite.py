@@ -0,0 +1,196 @@
+# End-to-end performance suite. Builds a synthetic desktop in a temp dir,
+# drives MainWindow under the offscreen platform and writes the results as
+# JSON so runs from different versions can be compared.
+#
+#   python benchmarks/suite.py --output results.json
+#   python benchmarks/suite.py --small-files 2000 --jpegs 20 --pdfs 2 --docx 2  # quick run
+#
+# The desktop is generated in a child process so that image encoding doesn't
+# count towards the measured peak RSS.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic import (
+    isolated_home, make_small_files, make_jpegs, make_pdfs, make_docx, find_other_device, wait_for_scan,
+    percentile, peak_rss_mb, pump,
+)
+
+
+def generate(args):
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    desktop = isolated_home(args.root)
+    make_small_files(desktop, args.small_files)
+    jpegs = make_jpegs(desktop, args.jpegs, args.jpeg_width, args.jpeg_height)
+    make_pdfs(desktop, args.pdfs, args.pdf_pages)
+    make_docx(desktop, args.docx, args.docx_paragraphs, jpegs[0] if jpegs else None)
+
+
+def summarize(latencies):
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def wait_for_moves(app, window, timeout=600):
+    deadline = time.perf_counter() + timeout
+    while not window.move_queue.is_idle():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("moves did not finish")
+        app.processEvents()
+
+
+def run(args, clutter_folder):
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    isolated_home(args.root)
+    from main import MainWindow
+
+    window = MainWindow(args.order, watch=False, clutter_folder=clutter_folder)
+    window.show()
+    while window.first_card_at is None:
+        app.processEvents()
+    time_to_first_card = window.first_card_at - window.started_at
+    wait_for_scan(app, window)
+    scan_done = time.perf_counter() - window.started_at
+    queued = len(window.current_files)
+
+    # Move throughput: a burst of discards from the head of the queue (the
+    # biggest files with the default order), timed until the queue drains.
+    burst = list(window.current_files)[:args.burst]
+    burst_bytes = sum(window.entries[path].size for path in burst)
+    start = time.perf_counter()
+    for _ in burst:
+        window.on_discard()
+    wait_for_moves(app, window)
+    burst_seconds = time.perf_counter() - start
+
+    # A seeded mix of swipes, timed from the call until its events are
+    # processed. Undos only follow a decision so there is always one to undo.
+    rng = random.Random(args.seed)
+    latencies = {"discard": [], "keep": [], "undo": []}
+    handlers = {"discard": window.on_discard, "keep": window.on_keep, "undo": window.on_undo}
+    for _ in range(min(args.swipes, len(window.current_files) - 1)):
+        action = rng.choices(["discard", "keep", "undo"], weights=[5, 4, 1])[0]
+        if action == "undo" and not window.undo_stack:
+            action = "keep"
+        start = time.perf_counter()
+        handlers[action]()
+        app.processEvents()
+        latencies[action].append(time.perf_counter() - start)
+        if args.swipe_interval:
+            pump(app, args.swipe_interval)
+    wait_for_moves(app, window)
+
+    result = {
+        "queued_files": queued,
+        "time_to_first_card_ms": time_to_first_card * 1000,
+        "scan_complete_ms": scan_done * 1000,
+        "swipe_latency": {action: summarize(values) for action, values in latencies.items()},
+        "move_burst": {
+            "files": len(burst),
+            "bytes": burst_bytes,
+            "seconds": burst_seconds,
+            "throughput_mb_s": burst_bytes / (1024 * 1024) / burst_seconds if burst_seconds else None,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    window.close()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, check=True,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small-files", type=int, default=10000)
+    parser.add_argument("--jpegs", type=int, default=200)
+    parser.add_argument("--jpeg-width", type=int, default=6000)
+    parser.add_argument("--jpeg-height", type=int, default=4000)
+    parser.add_argument("--pdfs", type=int, default=10)
+    parser.add_argument("--pdf-pages", type=int, default=300)
+    parser.add_argument("--docx", type=int, default=10)
+    parser.add_argument("--docx-paragraphs", type=int, default=5000)
+    parser.add_argument("--order", default="largest", help="queue order; 'largest' puts the heavy files first")
+    parser.add_argument("--swipes", type=int, default=300)
+    parser.add_argument("--swipe-interval", type=float, default=0.0, help="seconds of idle event loop between swipes")
+    parser.add_argument("--burst", type=int, default=50, help="files discarded back to back for the throughput figure")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--clutter-dir", help="parent for the Clutter folder (default: another filesystem if one is found)")
+    parser.add_argument("--output", help="write JSON results here as well as to stdout")
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    parser.add_argument("--generate", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="swiper-bench-")
+    clutter_parent = args.clutter_dir or find_other_device(tmp)
+    clutter_tmp = tempfile.mkdtemp(prefix="swiper-clutter-", dir=clutter_parent) if clutter_parent else None
+    try:
+        args.root = tmp
+        command = [sys.executable, os.path.abspath(__file__), "--generate", "--root", tmp] + sys.argv[1:]
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        generate_seconds = time.perf_counter() - start
+
+        clutter_folder = os.path.join(clutter_tmp, "Desktop Clutter") if clutter_tmp else None
+        # The app reports each move on stdout; keep stdout for the JSON.
+        with contextlib.redirect_stdout(sys.stderr):
+            measured = run(args, clutter_folder)
+        clutter_check = os.path.dirname(clutter_folder) if clutter_folder else os.path.join(tmp, "Desktop")
+        results = {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {k: v for k, v in vars(args).items() if k not in ("root", "generate", "output")},
+            "clutter_cross_device": os.stat(clutter_check).st_dev != os.stat(tmp).st_dev,
+            "generate_seconds": generate_seconds,
+        }
+        results.update(measured)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if clutter_tmp:
+            shutil.rmtree(clutter_tmp, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+
+def make_jpegs(directory, count, width=6000, height=4000):
+    # Gradients rather than flat fills, so the encoder can't shrink the files
+    # to nothing and decoding does real work.
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        image = QImage(width, height, QImage.Format_RGB32)
+        painter = QPainter(image)
+        gradient = QLinearGradient(0, 0, width, height)
+        gradient.setColorAt(0, QColor.fromHsv((i * 37) % 360, 200, 230))
+        gradient.setColorAt(1, QColor.fromHsv((i * 37 + 180) % 360, 160, 90))
+        painter.fillRect(image.rect(), gradient)
+        painter.setPen(Qt.white)
+        painter.drawText(image.rect(), Qt.AlignCenter, f"IMG_{i:04d}")
+        painter.end()
+        path = os.path.join(directory, f"IMG_{i:04d}.jpg")
+        image.save(path, "JPG", 92)
+        paths.append(path)
+    return paths
+
+
+def isolated_home(root):
+    # Points the app's desktop, cache and journal at root so a benchmark never
+    # touches the real ones. Must run before MainWindow is created.
+    os.environ["HOME"] = root
+    os.environ["USERPROFILE"] = root
+    os.environ["XDG_CACHE_HOME"] = os.path.join(root, ".cache")
+    os.environ["XDG_DATA_HOME"] = os.path.join(root, ".local", "share")
+    os.environ["LOCALAPPDATA"] = os.path.join(root, "AppData", "Local")
+    os.environ["APPDATA"] = os.path.join(root, "AppData", "Roaming")
+    desktop = os.path.join(root, "Desktop")
+    os.makedirs(desktop, exist_ok=True)
+    return desktop
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def pump(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+
+
+def make_small_files(directory, count, size=512):
+    os.makedirs(directory, exist_ok=True)
+    payload = b"x" * size
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"note_{i:05d}.txt")
+        with open(path, "wb") as f:
+            f.write(payload)
+        paths.append(path)
+    return paths
+
+
+def wait_for_scan(app, window, timeout=60):
+    # MainWindow starts its scan from the event loop, so pump events until the
+    # loader exists and has delivered everything.
+    deadline = time.perf_counter() + timeout
+    while window.file_loader is None or not window.file_loader.isFinished():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("desktop scan did not finish")
+        app.processEvents()
+    app.processEvents()
+
+
+def make_pdfs(directory, count, pages):
+    import fitz
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        doc = fitz.open()
+        for page_number in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Report {i}, page {page_number + 1}", fontsize=18)
+            page.insert_textbox(fitz.Rect(72, 110, 540, 760), "Lorem ipsum dolor sit amet. " * 60, fontsize=10)
+        path = os.path.join(directory, f"report_{i:03d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def make_docx(directory, count, paragraphs, image_path=None):
+    # image_path (e.g. one of the synthetic JPEGs) is embedded to give the
+    # package the bulk of a real report.
+    import docx
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        document = docx.Document()
+        document.add_heading(f"Quarterly report {i}", 0)
+        if image_path is not None:
+            document.add_picture(image_path)
+        for p in range(paragraphs):
+            document.add_paragraph(f"Paragraph {p}. " + "The quick brown fox jumps over the lazy dog. " * 8)
+        path = os.path.join(directory, f"quarterly_{i:03d}.docx")
+        document.save(path)
+        paths.append(path)
+    return paths
+
+
+def find_other_device(path, candidates=("/dev/shm", "/run/user", "/var/tmp", "/tmp")):
+    # A writable directory on a different filesystem than path, for exercising
+    # cross-device moves; None if there isn't one.
+    device = os.stat(path).st_dev
+    for candidate in candidates:
+        try:
+            if os.stat(candidate).st_dev != device and os.access(candidate, os.W_OK):
+                return candidate
+        except OSError:
+            continue
+    return None
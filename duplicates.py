@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+
+from userdirs import cache_dir
+
+# Finds files with identical contents in three passes, each only over what the
+# previous one couldn't tell apart: equal sizes, then equal hashes of the
+# first PARTIAL_BYTES, then equal full hashes. Qt-free, so it runs on a worker
+# thread (and the hashing in worker processes).
+
+PARTIAL_BYTES = 64 * 1024
+HASH_CHUNK = 1024 * 1024
+PARALLEL_MIN_BYTES = 512 * 1024 * 1024  # below this, starting worker processes costs more than it saves
+CACHE_NAME = "hashes.json"
+
+
+def hash_file(job):
+    # job is (path, limit); limit None hashes the whole file. Returns
+    # (path, hex digest or None if it couldn't be read). Top level so it can be
+    # sent to a process pool.
+    path, limit = job
+    digest = hashlib.blake2b(digest_size=20)
+    remaining = limit
+    try:
+        with open(path, "rb") as f:
+            while remaining is None or remaining > 0:
+                chunk = f.read(HASH_CHUNK if remaining is None else min(HASH_CHUNK, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+    except OSError:
+        return path, None
+    return path, digest.hexdigest()
+
+
+def hash_all(jobs, workers=None, stop=None):
+    # jobs are ((path, limit), file size). Small batches aren't worth starting
+    # processes for. "spawn" because the caller is usually a threaded GUI
+    # process, where fork isn't safe. Results stop early once stop() is true.
+    total = sum(min(limit, size) if limit else size for (_, limit), size in jobs)
+    jobs = [job for job, _ in jobs]
+    workers = workers or min(os.cpu_count() or 1, len(jobs), 8)
+    if workers == 1 or total < PARALLEL_MIN_BYTES:
+        results = []
+        for job in jobs:
+            if stop is not None and stop():
+                break
+            results.append(hash_file(job))
+        return results
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    results = []
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(hash_chunk, jobs[i:i + chunksize]) for i in range(0, len(jobs), chunksize)]
+        for future in futures:
+            if stop is not None and stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+            results.extend(future.result())
+    return results
+
+
+def hash_chunk(jobs):
+    return [hash_file(job) for job in jobs]
+
+
+class HashCache:
+    # Partial and full hashes by (device, inode), valid while size and
+    # mtime_ns are unchanged. Rewritten after each search with only the files
+    # that search looked at, so it never grows past the current desktop.
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), CACHE_NAME)
+        self.entries = None
+        self.seen = {}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, key, size, mtime_ns):
+        # Returns [size, mtime_ns, partial, full] for key, reset if stale.
+        if self.entries is None:
+            self.load()
+        record = self.seen.get(key) or self.entries.get(key)
+        if record is None or record[0] != size or record[1] != mtime_ns:
+            record = [size, mtime_ns, None, None]
+        self.seen[key] = record
+        return record
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.seen, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        self.entries = self.seen
+        self.seen = {}
+
+
+def find_duplicates(entries, cache=None, workers=None, stop=None):
+    # Returns groups (lists of FileEntry, two or more each) of files with the
+    # same contents. Empty files are left out; hard links to one inode are
+    # reported together but only hashed once. If stop() turns true the search gives up and
+    # returns what it has confirmed so far (usually nothing).
+    by_size = defaultdict(list)
+    for entry in entries:
+        if entry.size > 0:
+            by_size[entry.size].append(entry)
+
+    persist = cache is not None
+    if cache is None:
+        cache = HashCache()
+        cache.entries = {}
+    candidates = []  # (entry, hash cache record)
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        for entry in same_size:
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                continue
+            if stat.st_size != entry.size:
+                continue
+            record = cache.lookup(f"{stat.st_dev}:{stat.st_ino}", stat.st_size, stat.st_mtime_ns)
+            candidates.append((entry, record))
+
+    # Files no bigger than PARTIAL_BYTES are fully hashed by the first pass.
+    fill_hashes(candidates, 2, PARTIAL_BYTES, workers, stop)
+    for entry, record in candidates:
+        if record[2] is not None and entry.size <= PARTIAL_BYTES:
+            record[3] = record[2]
+
+    partial_groups = defaultdict(list)
+    for entry, record in candidates:
+        if record[2] is not None:
+            partial_groups[(entry.size, record[2])].append((entry, record))
+    colliding = [item for group in partial_groups.values() if len(group) > 1 for item in group]
+    fill_hashes(colliding, 3, None, workers, stop)
+
+    full_groups = defaultdict(list)
+    for entry, record in colliding:
+        if record[3] is not None:
+            full_groups[(entry.size, record[3])].append(entry)
+    if persist and not (stop is not None and stop()):
+        cache.save()
+    return [group for group in full_groups.values() if len(group) > 1]
+
+
+def fill_hashes(items, slot, limit, workers, stop):
+    # Hard links share a record, so each inode is read once.
+    missing = {}
+    for entry, record in items:
+        if record[slot] is None and id(record) not in missing:
+            missing[id(record)] = (entry.path, record)
+    if not missing:
+        return
+    by_path = {path: record for path, record in missing.values()}
+    jobs = [((path, limit), record[0]) for path, record in by_path.items()]
+    for path, digest in hash_all(jobs, workers, stop):
+        by_path[path][slot] = digest
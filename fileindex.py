@@ -0,0 +1,202 @@
+import os
+import time
+from collections import defaultdict, deque
+
+# Metadata for every file the scan has reported, by path, with secondary
+# indexes by extension, kind and age bucket so a whole group ("every .dmg",
+# "screenshots from the last week") is a few set lookups instead of a pass
+# over the queue or the disk.
+
+KIND_EXTENSIONS = {
+    "image": (".png", ".jpg", ".jpeg", ".gif", ".heic", ".webp", ".bmp", ".tif", ".tiff", ".svg"),
+    "document": (".pdf", ".doc", ".docx", ".odt", ".rtf", ".txt", ".md", ".pages",
+                 ".xls", ".xlsx", ".ods", ".csv", ".numbers", ".ppt", ".pptx", ".odp", ".key"),
+    "archive": (".zip", ".rar", ".7z", ".tar", ".gz", ".tgz", ".bz2", ".xz"),
+    "installer": (".dmg", ".pkg", ".exe", ".msi", ".deb", ".rpm", ".appimage", ".iso"),
+    "video": (".mp4", ".mov", ".avi", ".mkv", ".webm"),
+    "audio": (".mp3", ".wav", ".m4a", ".flac", ".aac", ".ogg"),
+}
+KINDS = {ext: kind for kind, extensions in KIND_EXTENSIONS.items() for ext in extensions}
+SCREENSHOT_PREFIXES = ("screenshot", "screen shot", "screen recording")
+
+DAY = 86400
+# (bucket, upper age bound in seconds); buckets don't overlap.
+AGE_BUCKETS = (
+    ("today", DAY),
+    ("week", 7 * DAY),
+    ("month", 30 * DAY),
+    ("year", 365 * DAY),
+    ("older", None),
+)
+
+
+def file_kind(name, extension):
+    kind = KINDS.get(extension, "other")
+    if kind in ("image", "video") and name.lower().startswith(SCREENSHOT_PREFIXES):
+        return "screenshot"
+    return kind
+
+
+def age_bucket(mtime_ns, now):
+    age = now - mtime_ns / 1e9
+    for bucket, limit in AGE_BUCKETS:
+        if limit is None or age < limit:
+            return bucket
+
+
+class FileIndex:
+    # Works as the path -> FileEntry dict MainWindow used to keep, with the
+    # secondary indexes updated on every insert and removal. Ages are bucketed
+    # when a file is added, against the clock at that moment.
+
+    def __init__(self):
+        self.entries = {}
+        self.keys = {}  # path -> (extension, kind, age bucket)
+        self.by_extension = defaultdict(set)
+        self.by_kind = defaultdict(set)
+        self.by_age = defaultdict(set)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __getitem__(self, path):
+        return self.entries[path]
+
+    def get(self, path, default=None):
+        return self.entries.get(path, default)
+
+    def values(self):
+        return self.entries.values()
+
+    def __setitem__(self, path, entry):
+        if path in self.entries:
+            self.unindex(path)
+        extension = os.path.splitext(entry.name)[1].lower()
+        key = (extension, file_kind(entry.name, extension), age_bucket(entry.mtime_ns, time.time()))
+        self.entries[path] = entry
+        self.keys[path] = key
+        self.by_extension[key[0]].add(path)
+        self.by_kind[key[1]].add(path)
+        self.by_age[key[2]].add(path)
+
+    def __delitem__(self, path):
+        del self.entries[path]
+        self.unindex(path)
+
+    def pop(self, path, *default):
+        if path not in self.entries:
+            if default:
+                return default[0]
+            raise KeyError(path)
+        entry = self.entries.pop(path)
+        self.unindex(path)
+        return entry
+
+    def unindex(self, path):
+        extension, kind, age = self.keys.pop(path)
+        for index, key in ((self.by_extension, extension), (self.by_kind, kind), (self.by_age, age)):
+            paths = index[key]
+            paths.discard(path)
+            if not paths:
+                del index[key]
+
+    def select(self, extensions=None, kinds=None, ages=None):
+        # Paths matching any of the given values in each dimension that is
+        # given. Only the smallest dimension's sets are combined in full; the
+        # others are intersected with that, so the cost follows the size of
+        # the group rather than of the index.
+        dimensions = []
+        for index, wanted in ((self.by_extension, extensions), (self.by_kind, kinds), (self.by_age, ages)):
+            if wanted is not None:
+                dimensions.append([index.get(key, set()) for key in wanted])
+        if not dimensions:
+            return set(self.entries)
+        dimensions.sort(key=lambda sets: sum(map(len, sets)))
+        selected = set().union(*dimensions[0])
+        for sets in dimensions[1:]:
+            selected = set().union(*(selected & paths for paths in sets))
+        return selected
+
+
+class FileQueue:
+    # Paths in the order they are to be decided on, indexed like FileIndex
+    # (by the entries in the FileIndex it is given), so a group of them can be
+    # found and taken out at a cost that follows the group's size. Taking a
+    # path out only unindexes it; its slot is skipped when reached and the
+    # slots are compacted once the stale ones outnumber the rest.
+
+    def __init__(self, entries, paths=()):
+        self.entries = entries
+        self.index = FileIndex()
+        self.order = deque()
+        self.stale = set()
+        for path in paths:
+            self.append(path)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __bool__(self):
+        return len(self.index) > 0
+
+    def __contains__(self, path):
+        return path in self.index
+
+    def __iter__(self):
+        for path in self.order:
+            if path not in self.stale:
+                yield path
+
+    def __getitem__(self, position):
+        # Only the front is ever looked at.
+        if position != 0 or not self.index:
+            raise IndexError(position)
+        self.trim()
+        return self.order[0]
+
+    def append(self, path):
+        self.add(path)
+        self.order.append(path)
+
+    def appendleft(self, path):
+        self.add(path)
+        self.order.appendleft(path)
+
+    def popleft(self):
+        path = self[0]
+        self.order.popleft()
+        self.index.pop(path)
+        return path
+
+    def discard(self, path):
+        if path in self.index:
+            self.index.pop(path)
+            self.stale.add(path)
+            if len(self.stale) > len(self.index):
+                self.compact()
+
+    def refresh(self, entry):
+        # A queued file changed on disk: re-index it where it stands.
+        if entry.path in self.index:
+            self.index[entry.path] = entry
+
+    def add(self, path):
+        # A path that is already queued moves to its new place.
+        self.discard(path)
+        if path in self.stale:
+            self.compact()
+        self.index[path] = self.entries[path]
+
+    def trim(self):
+        while self.order[0] in self.stale:
+            self.stale.discard(self.order.popleft())
+
+    def compact(self):
+        self.order = deque(path for path in self.order if path not in self.stale)
+        self.stale.clear()
@@ -0,0 +1,42 @@
+import threading
+
+
+class GroupCommit:
+    # Hands items added from any thread to one writer thread in batches. The
+    # first item of a batch wakes the writer, which then waits up to seconds
+    # for the rest of a burst to join it, so a burst costs one commit.
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.condition = threading.Condition()
+        self.pending = []
+        self.closed = False
+
+    def add(self, item):
+        with self.condition:
+            if self.closed:
+                return
+            self.pending.append(item)
+            if len(self.pending) == 1:
+                self.condition.notify()
+
+    def batches(self):
+        # Run by the writer thread: yields each batch, oldest item first,
+        # until close() and whatever was pending at the time has been yielded.
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                if not self.closed:
+                    self.condition.wait(self.seconds)
+                batch, self.pending = self.pending, []
+            yield batch
+
+    def close(self, discard=False):
+        with self.condition:
+            self.closed = True
+            if discard:
+                self.pending = []
+            self.condition.notify()
@@ -0,0 +1,153 @@
+# Rule-based desktop cleaning without the GUI, e.g. over SSH:
+#
+#   python headless.py --older-than 90d --larger-than 500M --dry-run
+#   python headless.py --ext .dmg --ext .zip --glob "Screenshot*"
+#
+# Only the standard library and the Qt-free scanner/mover modules are
+# imported, so this starts without loading PyQt5, PyMuPDF or python-docx.
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+
+from mover import move_file
+from scanner import iter_directory, format_size
+
+AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_age(text):
+    # "90d", "12h", "2w"; a bare number means days.
+    text = text.strip().lower()
+    unit = text[-1] if text and text[-1] in AGE_UNITS else "d"
+    number = text[:-1] if text and text[-1] in AGE_UNITS else text
+    try:
+        return float(number) * AGE_UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid age: {text!r}")
+
+
+def parse_size(text):
+    # "500M", "1.5G", "200K", or plain bytes.
+    text = text.strip().upper().rstrip("B") or "0"
+    unit = text[-1] if text[-1] in SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    try:
+        return int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+
+
+def build_rules(args):
+    # Each rule is (label, predicate(entry, now)).
+    rules = []
+    if args.ext:
+        extensions = {e.lower() if e.startswith(".") else "." + e.lower() for e in args.ext}
+        rules.append((
+            "extension " + ",".join(sorted(extensions)),
+            lambda entry, now: os.path.splitext(entry.name)[1].lower() in extensions,
+        ))
+    if args.older_than is not None:
+        rules.append((
+            f"older than {args.older_than_text}",
+            lambda entry, now: now - entry.mtime_ns / 1e9 > args.older_than,
+        ))
+    if args.larger_than is not None:
+        rules.append((
+            f"larger than {format_size(args.larger_than)}",
+            lambda entry, now: entry.size > args.larger_than,
+        ))
+    for pattern in args.glob or ():
+        rules.append((
+            f"name matches {pattern}",
+            lambda entry, now, pattern=pattern: fnmatch.fnmatch(entry.name.lower(), pattern.lower()),
+        ))
+    return rules
+
+
+def classify(entries, rules, match_all=False):
+    now = time.time()
+    for entry in entries:
+        reasons = [label for label, predicate in rules if predicate(entry, now)]
+        if reasons and (not match_all or len(reasons) == len(rules)):
+            yield entry, reasons
+
+
+def plan_targets(matches, clutter_folder):
+    # Picks collision-free names up front, so the parallel moves can't race
+    # each other (or clobber earlier discards) for the same target.
+    taken = set(os.listdir(clutter_folder)) if os.path.isdir(clutter_folder) else set()
+    plan = []
+    for entry, reasons in matches:
+        name = entry.name
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while name in taken:
+            name = f"{stem} ({counter}){ext}"
+            counter += 1
+        taken.add(name)
+        plan.append((entry, reasons, os.path.join(clutter_folder, name)))
+    return plan
+
+
+def main(argv=None):
+    desktop = os.path.join(os.path.expanduser("~"), "Desktop")
+    parser = argparse.ArgumentParser(description="Move desktop files matching rules into the Clutter folder.")
+    parser.add_argument("--desktop", default=desktop, help="folder to clean (default: ~/Desktop)")
+    parser.add_argument("--clutter", help="where matched files go (default: <desktop>/Desktop Clutter)")
+    parser.add_argument("--ext", action="append", help="match this extension (repeatable)")
+    parser.add_argument("--older-than", dest="older_than_text", metavar="AGE", help="match files not modified for AGE, e.g. 90d")
+    parser.add_argument("--larger-than", type=parse_size, metavar="SIZE", help="match files bigger than SIZE, e.g. 500M")
+    parser.add_argument("--glob", action="append", help="match file names against this pattern (repeatable)")
+    parser.add_argument("--all", dest="match_all", action="store_true", help="require every rule to match instead of any")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report what would be moved")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="parallel moves (default: 8)")
+    args = parser.parse_args(argv)
+    # Parsed here rather than as type= so the report can quote the age as given.
+    try:
+        args.older_than = parse_age(args.older_than_text) if args.older_than_text else None
+    except argparse.ArgumentTypeError as e:
+        parser.error(f"argument --older-than: {e}")
+
+    rules = build_rules(args)
+    if not rules:
+        parser.error("give at least one rule (--ext, --older-than, --larger-than, --glob)")
+    clutter_folder = args.clutter or os.path.join(args.desktop, "Desktop Clutter")
+
+    plan = plan_targets(classify(iter_directory(args.desktop), rules, args.match_all), clutter_folder)
+    now = time.time()
+    verb = "would move" if args.dry_run else "moving"
+    for entry, reasons, target in plan:
+        age_days = int((now - entry.mtime_ns / 1e9) // 86400)
+        print(f"{verb}  {format_size(entry.size):>10}  {age_days:>5}d  {entry.name}  [{'; '.join(reasons)}]")
+
+    total = sum(entry.size for entry, _, _ in plan)
+    if args.dry_run:
+        print(f"{len(plan)} files, {format_size(total)} would be moved to {clutter_folder}")
+        return 0
+    if not plan:
+        print("nothing to move")
+        return 0
+
+    # Deferred: concurrent.futures pulls in logging, which dry runs don't need.
+    from concurrent.futures import ThreadPoolExecutor
+
+    os.makedirs(clutter_folder, exist_ok=True)
+    errors = 0
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [(entry, pool.submit(move_file, entry.path, target)) for entry, _, target in plan]
+        for entry, future in futures:
+            try:
+                future.result()
+            except OSError as e:
+                errors += 1
+                print(f"error moving {entry.name}: {e}", file=sys.stderr)
+    print(f"moved {len(plan) - errors} files, {format_size(total)} to {clutter_folder}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
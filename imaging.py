@@ -0,0 +1,148 @@
+import struct
+
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage, QImageReader, QTransform
+
+# Image decoding for previews. Everything here works on QImage, so it is safe
+# to call from preview worker threads.
+
+PREVIEW_SIZE = 300
+EXIF_SCAN_BYTES = 128 * 1024
+
+
+def read_exif_thumbnail(file_path):
+    # Returns (orientation, thumbnail JPEG bytes or None) from a JPEG's APP1
+    # segment, reading only the head of the file.
+    with open(file_path, "rb") as f:
+        head = f.read(EXIF_SCAN_BYTES)
+    if head[:2] != b"\xff\xd8":
+        return 1, None
+
+    pos = 2
+    while pos + 4 <= len(head) and head[pos] == 0xFF:
+        marker = head[pos + 1]
+        length = struct.unpack(">H", head[pos + 2:pos + 4])[0]
+        if marker == 0xDA:  # start of scan, no metadata past here
+            break
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b"Exif\0\0":
+            return parse_exif(head[pos + 10:pos + 2 + length])
+        pos += 2 + length
+    return 1, None
+
+
+def parse_exif(tiff):
+    if tiff[:2] == b"II":
+        order = "<"
+    elif tiff[:2] == b"MM":
+        order = ">"
+    else:
+        return 1, None
+
+    def read_ifd(offset):
+        tags = {}
+        if offset + 2 > len(tiff):
+            return tags, 0
+        count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            if entry + 12 > len(tiff):
+                return tags, 0
+            tag, kind = struct.unpack(order + "HH", tiff[entry:entry + 4])
+            if kind == 3:  # SHORT
+                value = struct.unpack(order + "H", tiff[entry + 8:entry + 10])[0]
+            elif kind == 4:  # LONG
+                value = struct.unpack(order + "I", tiff[entry + 8:entry + 12])[0]
+            else:
+                continue
+            tags[tag] = value
+        end = offset + 2 + count * 12
+        next_ifd = struct.unpack(order + "I", tiff[end:end + 4])[0] if end + 4 <= len(tiff) else 0
+        return tags, next_ifd
+
+    try:
+        ifd0, ifd1_offset = read_ifd(struct.unpack(order + "I", tiff[4:8])[0])
+        orientation = ifd0.get(0x0112, 1)
+        if not ifd1_offset:
+            return orientation, None
+        ifd1, _ = read_ifd(ifd1_offset)
+    except struct.error:
+        return 1, None
+
+    start = ifd1.get(0x0201)
+    length = ifd1.get(0x0202)
+    if not start or not length or start + length > len(tiff):
+        return orientation, None
+    return orientation, tiff[start:start + length]
+
+
+def apply_orientation(image, orientation):
+    if orientation == 2:
+        return image.mirrored(True, False)
+    if orientation == 3:
+        return image.transformed(QTransform().rotate(180))
+    if orientation == 4:
+        return image.mirrored(False, True)
+    if orientation == 5:
+        return image.transformed(QTransform().rotate(90)).mirrored(True, False)
+    if orientation == 6:
+        return image.transformed(QTransform().rotate(90))
+    if orientation == 7:
+        return image.transformed(QTransform().rotate(270)).mirrored(True, False)
+    if orientation == 8:
+        return image.transformed(QTransform().rotate(270))
+    return image
+
+
+def exif_thumbnail_image(file_path, full_size, max_size):
+    # Only worth using when it is big enough for the requested box and has the
+    # same shape as the photo (some cameras letterbox their thumbnails).
+    try:
+        orientation, data = read_exif_thumbnail(file_path)
+    except OSError:
+        return None
+    if not data:
+        return None
+    thumb = QImage.fromData(data, "JPG")
+    if thumb.isNull() or max(thumb.width(), thumb.height()) < max_size:
+        return None
+    if full_size.isValid():
+        full_ratio = full_size.width() / full_size.height()
+        thumb_ratio = thumb.width() / thumb.height()
+        if abs(full_ratio - thumb_ratio) > 0.02 * full_ratio:
+            return None
+    thumb = apply_orientation(thumb, orientation)
+    return thumb.scaled(max_size, max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def load_scaled_image(file_path, max_size=PREVIEW_SIZE):
+    # Reads the header first and asks the decoder for a reduced size, so a
+    # 6000x4000 JPEG is DCT-scaled while decoding instead of being expanded to
+    # ~96 MB and then shrunk. Returns a null QImage on failure.
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    full_size = reader.size()
+
+    if bytes(reader.format()).lower() in (b"jpg", b"jpeg"):
+        thumb = exif_thumbnail_image(file_path, full_size, max_size)
+        if thumb is not None:
+            return thumb
+
+    if full_size.isValid() and (full_size.width() > max_size or full_size.height() > max_size):
+        reader.setScaledSize(full_size.scaled(max_size, max_size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return image
+    if image.width() > max_size or image.height() > max_size:
+        image = image.scaled(max_size, max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+def image_to_bytes(image):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    if image.hasAlphaChannel():
+        image.save(buffer, "PNG")
+    else:
+        image.save(buffer, "JPG", 90)
+    return bytes(data)
@@ -0,0 +1,158 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+# Timing spans around the hot paths, switched on with CLEAN_DESKTOP_TRACE:
+#
+#   CLEAN_DESKTOP_TRACE=1            record spans, show the debug overlay and
+#                                    write ./clean_desktop-trace-<pid>.json on exit
+#   CLEAN_DESKTOP_TRACE=out.json     same, writing the trace to out.json
+#
+# The trace file is Chrome trace-event JSON (chrome://tracing, Perfetto).
+# When the variable is unset span() hands back one shared no-op object, so
+# instrumented code pays a function call and nothing else.
+
+TRACE_SETTING = os.environ.get("CLEAN_DESKTOP_TRACE", "")
+ENABLED = TRACE_SETTING not in ("", "0")
+ROLLING_WINDOW = 100  # durations kept per span name for the overlay
+MAX_EVENTS = 200000  # oldest events are dropped past this
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+events = deque(maxlen=MAX_EVENTS)
+recent = defaultdict(lambda: deque(maxlen=ROLLING_WINDOW))
+thread_names = {}
+lock = threading.Lock()
+
+
+def span(name, **args):
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, args)
+
+
+def traced(name):
+    # Decorator form of span() for whole functions; with tracing off the
+    # function is returned untouched.
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, start, end, args=None):
+    thread = threading.current_thread()
+    with lock:
+        events.append((name, start, end - start, thread.ident, args or None))
+        recent[name].append(end - start)
+        thread_names.setdefault(thread.ident, thread.name)
+
+
+def rolling_stats():
+    # [(name, count, p50 ms, p99 ms, max ms)] over the last ROLLING_WINDOW
+    # spans of each name.
+    with lock:
+        snapshot = {name: sorted(values) for name, values in recent.items()}
+    stats = []
+    for name in sorted(snapshot):
+        values = snapshot[name]
+        if not values:
+            continue
+        stats.append((
+            name,
+            len(values),
+            values[len(values) // 2] * 1000,
+            values[min(int(len(values) * 0.99), len(values) - 1)] * 1000,
+            values[-1] * 1000,
+        ))
+    return stats
+
+
+def chrome_trace():
+    with lock:
+        recorded = list(events)
+        names = dict(thread_names)
+    origin = min((start for _, start, _, _, _ in recorded), default=0.0)
+    pid = os.getpid()
+    trace = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in names.items()
+    ]
+    for name, start, duration, tid, args in recorded:
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start - origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        trace.append(event)
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def trace_path():
+    if TRACE_SETTING.lower().endswith(".json"):
+        return TRACE_SETTING
+    return os.path.join(os.getcwd(), f"clean_desktop-trace-{os.getpid()}.json")
+
+
+def export(path=None):
+    path = path or trace_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+    return path
+
+
+def export_at_exit():
+    if events:
+        print(f"Wrote trace to {export()}")
+
+
+if ENABLED:
+    atexit.register(export_at_exit)
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+
+from groupcommit import GroupCommit
+from userdirs import data_dir
+
+JOURNAL_NAME = "decisions.jsonl"
+GROUP_COMMIT_SECONDS = 1.0
+UNDO_HISTORY = 200  # undo steps carried across restarts and compactions
+COMPACT_MIN_LINES = 1000
+
+
+class Journal:
+    # Append-only JSON-lines log of keep/discard/undo decisions. Records are
+    # applied to the in-memory state immediately and written by a background
+    # thread that batches everything arriving within GROUP_COMMIT_SECONDS into
+    # one write + fsync, so a swipe never waits on the disk.
+    #
+    # Record ops:
+    #   keep     {path, size, mtime_ns}       a keep, also an undo step
+    #   discard  {path, to, size, mtime_ns}   a move to Clutter, also an undo step
+    #   batch    {discards: [discard, ...]}   several moves undone as one step
+    #   keeps    {keeps: [keep, ...]}         several keeps undone as one step
+    #   undo     {}                           reverts the latest undo step
+    #   failed   {to}                         a discard whose move failed
+    #   kept     {path, size, mtime_ns}       keep state only (written by compaction)
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), JOURNAL_NAME)
+        self.kept = {}  # path -> (size, mtime_ns) it had when it was kept
+        self.history = []  # keep/discard records that can still be undone, oldest first
+        self.line_count = 0
+        self.commits = GroupCommit(GROUP_COMMIT_SECONDS)
+        self.file = None
+        self.thread = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.replay()
+        if self.line_count > COMPACT_MIN_LINES and self.line_count > 2 * (len(self.kept) + UNDO_HISTORY):
+            self.compact()
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self.run, name="journal", daemon=True)
+        self.thread.start()
+
+    def replay(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from a crash mid-write. It was never
+                    # committed, so cut it off rather than append after it.
+                    os.truncate(self.path, end)
+                    break
+                end += len(line)
+                self.line_count += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.apply(record)
+
+    def apply(self, record):
+        op = record.get("op")
+        if op == "keep" or op == "kept":
+            self.kept[record["path"]] = (record["size"], record["mtime_ns"])
+            if op == "keep":
+                self.history.append(record)
+        elif op == "keeps":
+            for keep in record["keeps"]:
+                self.kept[keep["path"]] = (keep["size"], keep["mtime_ns"])
+            self.history.append(record)
+        elif op == "discard" or op == "batch":
+            self.history.append(record)
+        elif op == "undo":
+            if self.history:
+                last = self.history.pop()
+                if last["op"] == "keep":
+                    self.kept.pop(last["path"], None)
+                elif last["op"] == "keeps":
+                    for keep in last["keeps"]:
+                        self.kept.pop(keep["path"], None)
+        elif op == "failed":
+            for i in range(len(self.history) - 1, -1, -1):
+                step = self.history[i]
+                if step["op"] == "discard" and step["to"] == record["to"]:
+                    del self.history[i]
+                    break
+                if step["op"] == "batch" and any(d["to"] == record["to"] for d in step["discards"]):
+                    step["discards"] = [d for d in step["discards"] if d["to"] != record["to"]]
+                    if not step["discards"]:
+                        del self.history[i]
+                    break
+
+    def compact(self):
+        # Rewrites the journal as the current keep state plus the last
+        # UNDO_HISTORY undo steps, dropping files that no longer exist.
+        tail = self.history[-UNDO_HISTORY:]
+        tail_keeps = {record["path"] for record in tail if record["op"] == "keep"}
+        tail_keeps.update(keep["path"] for record in tail if record["op"] == "keeps" for keep in record["keeps"])
+        records = [
+            {"op": "kept", "path": path, "size": size, "mtime_ns": mtime_ns}
+            for path, (size, mtime_ns) in self.kept.items()
+            if path not in tail_keeps and os.path.exists(path)
+        ]
+        records.extend(tail)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self.kept = {}
+        self.history = []
+        for record in records:
+            self.apply(record)
+        self.line_count = len(records)
+
+    def is_kept(self, path, size, mtime_ns):
+        # A kept file that has changed since is asked about again.
+        return self.kept.get(path) == (size, mtime_ns)
+
+    def record_keep(self, path, size, mtime_ns):
+        self.append({"op": "keep", "path": path, "size": size, "mtime_ns": mtime_ns})
+
+    def record_discard(self, path, to, size, mtime_ns):
+        self.append({"op": "discard", "path": path, "to": to, "size": size, "mtime_ns": mtime_ns})
+
+    def record_batch(self, discards):
+        # discards: (path, to, size, mtime_ns) tuples
+        self.append({"op": "batch", "discards": [
+            {"path": path, "to": to, "size": size, "mtime_ns": mtime_ns}
+            for path, to, size, mtime_ns in discards
+        ]})
+
+    def record_keeps(self, keeps):
+        # keeps: (path, size, mtime_ns) tuples
+        self.append({"op": "keeps", "keeps": [
+            {"path": path, "size": size, "mtime_ns": mtime_ns}
+            for path, size, mtime_ns in keeps
+        ]})
+
+    def record_undo(self):
+        self.append({"op": "undo"})
+
+    def record_failed(self, to):
+        self.append({"op": "failed", "to": to})
+
+    def append(self, record):
+        self.apply(record)
+        self.commits.add(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def run(self):
+        for lines in self.commits.batches():
+            self.file.write("".join(lines))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.commits.close()
+        self.thread.join()
+        self.thread = None
+        self.file.close()
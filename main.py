@@ -1,25 +1,597 @@
 import sys
 import os
-import shutil
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QStackedWidget, QFileIconProvider, QStyle, QFrame, QTextEdit, QScrollArea
-from PyQt5.QtGui import QIcon, QPixmap, QKeyEvent, QColor, QPainter, QImage, QFont, QPalette
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QFileInfo, QEvent, QRect, QTimer
-
-import fitz  # PyMuPDF for PDF preview
-from docx import Document  # python-docx for DOCX preview
+import argparse
+import heapq
+import html
+import math
+import multiprocessing
+import threading
+import time
+from collections import deque, OrderedDict
+from itertools import islice
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QStackedWidget, QFileIconProvider, QStyle, QFrame, QTextEdit, QScrollArea, QMenu, QLineEdit, QListView, QAbstractItemView
+from PyQt5.QtGui import QKeySequence, QIcon, QPixmap, QKeyEvent, QColor, QPainter, QImage, QFont, QPalette
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QFileInfo, QEvent, QRect, QTimer, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex, QItemSelectionModel
+
+from imaging import load_scaled_image, image_to_bytes
+from previews import extract_pdf_preview, extract_docx_text, extract_text_preview, extract_archive_preview, warm_backends, ZIP_EXTENSIONS, TAR_EXTENSIONS
+from scanner import FileEntry, iter_batches, format_size, SORT_KEYS
+from watcher import DesktopWatcher
+from mover import move_file
+from journal import Journal, UNDO_HISTORY
+from duplicates import find_duplicates, HashCache
+from fileindex import FileIndex, FileQueue
+from textindex import SearchIndex, CONTENT_EXTENSIONS, index_file, tokenize
+from metastore import MetadataStore, file_key
+import instrument
+from instrument import span, traced
+from thumbcache import ThumbnailCache
+
+CARD_WINDOW = 3  # number of upcoming files that get a materialized FileCard
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+TEXT_EXTENSIONS = [
+    '.txt', '.md', '.rst', '.log', '.csv', '.tsv', '.json', '.xml', '.yaml', '.yml', '.toml', '.ini', '.cfg',
+    '.py', '.js', '.ts', '.html', '.css', '.sh', '.bat', '.ps1', '.c', '.h', '.cpp', '.java', '.go', '.rs', '.rb', '.sql',
+]
+ARCHIVE_EXTENSIONS = list(ZIP_EXTENSIONS + TAR_EXTENSIONS)
+ASYNC_PREVIEW_EXTENSIONS = IMAGE_EXTENSIONS + ['.pdf', '.docx'] + TEXT_EXTENSIONS + ARCHIVE_EXTENSIONS
+LAYOUT_DEBOUNCE_MS = 30
+DEFAULT_RECURSIVE_DEPTH = 3
+PREVIEW_MEMORY_MB = 64  # decoded previews kept in memory for prefetch and undo
+PREFETCH_MIN = 4  # previews decoded ahead of the current card, before any swipes
+PREFETCH_MAX = 24
+UNDO_WARM_STEPS = 4  # undo steps whose previews are kept from eviction
+SWIPE_IDLE_SECONDS = 5  # longer gaps than this don't count towards the swipe rate
+SEARCH_DEBOUNCE_MS = 150
+INDEX_WORKERS = 4
+INDEX_CHUNK = 16  # files per round of content extraction
+GRID_THUMB_SIZE = 128
+GRID_BATCH = 16  # thumbnails per worker job
+GRID_BATCH_MS = 30  # requests from painting are collected this long before jobs go out
+GRID_LOOKAHEAD = 48  # thumbnails loaded past the last visible cell
+GRID_THUMBNAILS = 1500  # decoded thumbnails kept in memory
+GRID_MAX_RANGES = 64  # row ranges updated in place before the model is reset instead
+GROUP_EXTENSIONS = 8  # most common extensions offered in the group menu
+GROUP_KINDS = (
+    ("Screenshots", "screenshot"),
+    ("Images", "image"),
+    ("Documents", "document"),
+    ("Archives", "archive"),
+    ("Installers", "installer"),
+    ("Videos", "video"),
+    ("Audio", "audio"),
+)
+GROUP_AGES = (
+    ("From today", ("today",)),
+    ("From the last 7 days", ("today", "week")),
+    ("From the last 30 days", ("today", "week", "month")),
+    ("Older than 30 days", ("year", "older")),
+    ("Older than a year", ("older",)),
+)
+
+BUTTON_STYLE = """
+    QPushButton {{
+        font-size: {font_size}px;
+        font-weight: bold;
+        border-radius: {radius}px;
+        padding: {padding};
+        background-color: {color};
+        color: white;
+        border: none;
+    }}
+    QPushButton:hover {{
+        background-color: {hover};
+    }}
+    QPushButton:pressed {{
+        background-color: {pressed};
+    }}
+"""
+LABEL_STYLE = "QLabel {{ font-size: {font_size}px; color: {color}; margin-top: 5px; font-weight: {weight}; }}"
 
 class FileLoader(QThread):
-    file_loaded = pyqtSignal(str, str)
+    # Emits lists of scanner.FileEntry, one cross-thread event per batch
+    # rather than per file.
+    files_loaded = pyqtSignal(list)
 
-    def __init__(self, desktop_path):
+    def __init__(self, desktop_path, order=None, depth=0, exclude=()):
         super().__init__()
         self.desktop_path = desktop_path
+        self.order = order
+        self.depth = depth
+        self.exclude = exclude
+
+    @traced("scan")
+    def run(self):
+        for batch in iter_batches(self.desktop_path, self.order, depth=self.depth, exclude=self.exclude):
+            self.files_loaded.emit(batch)
+
+def cached_image(thumbnail_cache, file_path, stat, variant):
+    if thumbnail_cache is None:
+        return None
+    with span("preview.cache"):
+        data = thumbnail_cache.get(file_path, stat.st_size, stat.st_mtime_ns, variant)
+    if data is None:
+        return None
+    image = QImage.fromData(data)
+    return None if image.isNull() else image
+
+def stored_preview(store, file_path, extract):
+    # Text-like previews from the metadata store when the file is unchanged,
+    # otherwise extracted and stored. Only successful extractions are stored.
+    if store is None:
+        return extract()
+    key = file_key(os.stat(file_path))
+    result = store.get_preview(key)
+    if result is None:
+        result = extract()
+        store.put_preview(key, file_path, result)
+    return result
+
+def render_preview(file_path, thumbnail_cache=None, store=None):
+    # Runs on a preview worker thread: only QImage and plain Python here, never
+    # QPixmap or widgets. Returns a (kind, payload) tuple for FileCard.apply_preview.
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    if file_extension in IMAGE_EXTENSIONS:
+        stat = os.stat(file_path)
+        image = cached_image(thumbnail_cache, file_path, stat, "preview")
+        if image is not None:
+            return ("image", image)
+        with span("preview.image"):
+            image = load_scaled_image(file_path)
+        if image.isNull():
+            return ("message", "Error loading image")
+        if thumbnail_cache is not None:
+            thumbnail_cache.put(file_path, stat.st_size, stat.st_mtime_ns, image_to_bytes(image))
+        return ("image", image)
+    elif file_extension == '.pdf':
+        try:
+            stat = os.stat(file_path)
+            image = cached_image(thumbnail_cache, file_path, stat, "pdf-page1")
+            if image is not None:
+                return ("image", image)
+            if store is not None:
+                result = store.get_preview(file_key(stat))
+                if result is not None:
+                    return result
+            with span("preview.pdf"):
+                kind, payload = extract_pdf_preview(file_path)
+            if kind == "png":
+                if thumbnail_cache is not None:
+                    thumbnail_cache.put(file_path, stat.st_size, stat.st_mtime_ns, payload, "pdf-page1")
+                return ("image", QImage.fromData(payload, "PNG"))
+            if store is not None:
+                store.put_preview(file_key(stat), file_path, ("text", payload))
+            return ("text", payload)
+        except Exception as e:
+            return ("text", f"Error loading PDF: {str(e)}")
+    elif file_extension == '.docx':
+        try:
+            with span("preview.docx"):
+                return stored_preview(store, file_path, lambda: ("text", extract_docx_text(file_path)))
+        except Exception as e:
+            return ("text", f"Error loading DOCX: {str(e)}")
+    elif file_extension in TEXT_EXTENSIONS:
+        try:
+            with span("preview.text"):
+                return stored_preview(store, file_path, lambda: extract_text_preview(file_path))
+        except Exception as e:
+            return ("text", f"Error loading text: {str(e)}")
+    elif file_extension in ARCHIVE_EXTENSIONS:
+        try:
+            with span("preview.archive"):
+                return stored_preview(store, file_path, lambda: extract_archive_preview(file_path))
+        except Exception as e:
+            return ("text", f"Error loading archive: {str(e)}")
+    return ("message", "No preview available")
+
+class PreviewSignals(QObject):
+    finished = pyqtSignal(int, object)
+
+class PreviewJob(QRunnable):
+    def __init__(self, job_id, file_path, signals, thumbnail_cache, store=None):
+        super().__init__()
+        # The engine keeps the Python reference; letting Qt delete the
+        # runnable would race with tryTake() on cancellation.
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.file_path = file_path
+        self.signals = signals
+        self.thumbnail_cache = thumbnail_cache
+        self.store = store
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    def run(self):
+        if self.cancelled:
+            return
+        start = time.perf_counter()
+        try:
+            with span("preview", file=os.path.basename(self.file_path)):
+                result = render_preview(self.file_path, self.thumbnail_cache, self.store)
+        except Exception as e:
+            result = ("message", f"Error loading preview: {str(e)}")
+        self.elapsed = time.perf_counter() - start
+        if not self.cancelled:
+            self.signals.finished.emit(self.job_id, result)
+
+def result_bytes(result):
+    kind, payload = result
+    if kind == "image":
+        return payload.sizeInBytes()
+    if kind == "table":
+        return sum(len(cell) for row in payload for cell in row) * 2
+    return len(payload) * 2
+
+def table_html(rows):
+    # The first row is taken as the header.
+    parts = ['<table cellspacing="0" cellpadding="4" border="1" style="border-collapse: collapse;">']
+    for index, row in enumerate(rows):
+        tag = "th" if index == 0 else "td"
+        parts.append("<tr>" + "".join(f"<{tag}>{html.escape(cell)}</{tag}>" for cell in row) + "</tr>")
+    parts.append("</table>")
+    return "".join(parts)
+
+class PreviewEngine(QObject):
+    # Renders previews on a thread pool and remembers finished results, most
+    # recently used last, up to memory_budget bytes. A request for a
+    # remembered path is answered on the spot, and one for a path that is
+    # already being prefetched takes that job over instead of starting another.
+    def __init__(self, thumbnail_cache=None, parent=None, memory_budget=PREVIEW_MEMORY_MB * 1024 * 1024, store=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.store = store
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(QThread.idealThreadCount() - 1, 2))
+        self.signals = PreviewSignals()
+        self.signals.finished.connect(self.on_job_finished)
+        self.jobs = {}
+        self.jobs_by_path = {}
+        self.next_job_id = 0
+        self.thumbnail_signals = ThumbnailSignals()
+        self.thumbnail_signals.finished.connect(self.on_thumbnails_finished)
+        self.thumbnail_jobs = {}  # job id -> (ThumbnailJob, callback)
+        self.memory_budget = memory_budget
+        self.results = OrderedDict()  # path -> (result, bytes)
+        self.result_bytes = 0
+        self.render_seconds = None  # moving average of render times
+
+    def request(self, file_path, callback, priority=0):
+        # Returns a job id to cancel, or None if callback has already run.
+        cached = self.results.get(file_path)
+        if cached is not None:
+            self.results.move_to_end(file_path)
+            callback(cached[0])
+            return None
+        job_id = self.jobs_by_path.get(file_path)
+        if job_id is not None and self.jobs[job_id][1] is None:
+            job = self.jobs[job_id][0]
+            self.jobs[job_id] = (job, callback)
+            if self.pool.tryTake(job):
+                self.pool.start(job, priority)
+            return job_id
+        return self.start_job(file_path, callback, priority)
+
+    def prefetch(self, file_path, priority=-1):
+        if file_path in self.results or file_path in self.jobs_by_path:
+            return None
+        return self.start_job(file_path, None, priority)
+
+    def start_job(self, file_path, callback, priority):
+        self.next_job_id += 1
+        job = PreviewJob(self.next_job_id, file_path, self.signals, self.thumbnail_cache, self.store)
+        self.jobs[job.job_id] = (job, callback)
+        self.jobs_by_path[file_path] = job.job_id
+        self.pool.start(job, priority)
+        return job.job_id
+
+    def cancel(self, job_id):
+        # A job that is already running is left to finish so its result can
+        # still be remembered; only the callback is dropped.
+        entry = self.jobs.get(job_id)
+        if entry is None:
+            return
+        job = entry[0]
+        if self.pool.tryTake(job):
+            job.cancelled = True
+            del self.jobs[job_id]
+            self.jobs_by_path.pop(job.file_path, None)
+        else:
+            self.jobs[job_id] = (job, None)
+
+    def request_thumbnails(self, file_paths, callback, priority=0):
+        # Grid thumbnails, one job per batch on the same pool as previews. A
+        # remembered card preview goes along to be scaled down rather than
+        # the file being decoded again. callback gets the job id and a list
+        # of (path, QImage) pairs.
+        items = []
+        for file_path in file_paths:
+            cached = self.results.get(file_path)
+            items.append((file_path, cached[0][1] if cached is not None and cached[0][0] == "image" else None))
+        self.next_job_id += 1
+        job = ThumbnailJob(self.next_job_id, items, self.thumbnail_signals, self.thumbnail_cache)
+        self.thumbnail_jobs[job.job_id] = (job, callback)
+        self.pool.start(job, priority)
+        return job.job_id
+
+    def cancel_thumbnails(self, job_id):
+        # True if the job hadn't started and has been taken back.
+        entry = self.thumbnail_jobs.get(job_id)
+        if entry is None or not self.pool.tryTake(entry[0]):
+            return False
+        del self.thumbnail_jobs[job_id]
+        return True
+
+    def on_thumbnails_finished(self, job_id, results):
+        entry = self.thumbnail_jobs.pop(job_id, None)
+        if entry is not None:
+            entry[1](job_id, results)
+
+    def cancel_prefetch(self, job_id):
+        # Leaves jobs alone that a card has taken over since.
+        entry = self.jobs.get(job_id)
+        if entry is not None and entry[1] is None:
+            self.cancel(job_id)
+
+    def on_job_finished(self, job_id, result):
+        entry = self.jobs.pop(job_id, None)
+        if entry is None:
+            return
+        job, callback = entry
+        if self.jobs_by_path.get(job.file_path) == job_id:
+            del self.jobs_by_path[job.file_path]
+        if self.render_seconds is None:
+            self.render_seconds = job.elapsed
+        else:
+            self.render_seconds = 0.8 * self.render_seconds + 0.2 * job.elapsed
+        self.remember(job.file_path, result)
+        if callback is not None:
+            callback(result)
+
+    def remember(self, file_path, result):
+        # Placeholders and errors are cheap to redo and may not be final.
+        self.forget(file_path)
+        size = result_bytes(result)
+        if result[0] == "message" or size > self.memory_budget:
+            return
+        self.results[file_path] = (result, size)
+        self.result_bytes += size
+        while self.result_bytes > self.memory_budget:
+            _, (_, evicted) = self.results.popitem(last=False)
+            self.result_bytes -= evicted
+
+    def forget(self, file_path):
+        cached = self.results.pop(file_path, None)
+        if cached is not None:
+            self.result_bytes -= cached[1]
+
+    def touch(self, file_paths):
+        # Marks results as recently used so eviction takes other ones first.
+        for file_path in file_paths:
+            if file_path in self.results:
+                self.results.move_to_end(file_path)
+
+    def average_bytes(self):
+        if not self.results:
+            return 0
+        return self.result_bytes / len(self.results)
+
+    def shutdown(self):
+        for job, _ in self.jobs.values():
+            job.cancelled = True
+            self.pool.tryTake(job)
+        self.jobs.clear()
+        self.jobs_by_path.clear()
+        for job, _ in self.thumbnail_jobs.values():
+            job.cancelled = True
+            self.pool.tryTake(job)
+        self.thumbnail_jobs.clear()
+        self.pool.waitForDone()
+
+class MoveQueue(QThread):
+    # Runs file moves one at a time, in submission order, off the GUI thread.
+    # Ordering matters: an undo queued behind its own discard always sees the
+    # discard finished first.
+    move_progress = pyqtSignal(str, object, object)
+    move_finished = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.callbacks = {}
+        self.next_job_id = 0
+        self.stopping = False
+        self.move_finished.connect(self.on_move_finished)
+
+    def submit(self, src, dst, callback):
+        with self.condition:
+            self.next_job_id += 1
+            self.pending.append((self.next_job_id, src, dst))
+            self.callbacks[self.next_job_id] = callback
+            self.condition.notify()
+            return self.next_job_id
+
+    def cancel(self, job_id):
+        # Only jobs that haven't started can be cancelled.
+        with self.condition:
+            for job in self.pending:
+                if job[0] == job_id:
+                    self.pending.remove(job)
+                    self.callbacks.pop(job_id, None)
+                    return True
+        return False
+
+    def is_idle(self):
+        return not self.callbacks
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                job_id, src, dst = self.pending.popleft()
+            name = os.path.basename(src)
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                with span("move", file=name):
+                    move_file(src, dst, lambda done, total: self.move_progress.emit(name, done, total))
+                error = None
+            except Exception as e:
+                error = str(e)
+            self.move_finished.emit(job_id, error)
+
+    def on_move_finished(self, job_id, error):
+        callback = self.callbacks.pop(job_id, None)
+        if callback is not None:
+            callback(error)
+
+    def finish(self):
+        # Lets every queued move complete; closing mid-copy would leave a
+        # partial file in the Clutter folder.
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.wait()
+
+class SearchIndexer(QThread):
+    # Feeds SearchIndex as files arrive: names straight away, then document
+    # contents extracted in worker processes a chunk at a time. "spawn"
+    # workers, since forking a threaded Qt process isn't safe.
+    indexed = pyqtSignal()
+
+    def __init__(self, index, store=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.store = store
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.stopping = False
+
+    def add(self, entries):
+        with self.condition:
+            self.pending.extend(entries)
+            self.condition.notify()
+
+    def run(self):
+        pool = None
+        try:
+            while True:
+                with self.condition:
+                    while not self.pending and not self.stopping:
+                        self.condition.wait()
+                    if self.stopping:
+                        return
+                    entries = list(self.pending)
+                    self.pending.clear()
+
+                contents = []
+                for entry in entries:
+                    self.index.add(entry.path, tokenize(entry.name))
+                    if os.path.splitext(entry.name)[1].lower() in CONTENT_EXTENSIONS:
+                        contents.append(entry.path)
+                contents = self.add_stored(contents)
+                with self.index.lock:
+                    self.index.sort_vocabulary()
+                self.indexed.emit()
+
+                if contents and pool is None:
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    workers = max(min((os.cpu_count() or 2) - 1, INDEX_WORKERS), 1)
+                    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+                for start in range(0, len(contents), INDEX_CHUNK):
+                    if self.stopping:
+                        return
+                    with span("index", files=len(contents[start:start + INDEX_CHUNK])):
+                        for file_path, tokens in pool.map(index_file, contents[start:start + INDEX_CHUNK]):
+                            self.index.extend(file_path, tokens)
+                            self.store_tokens(file_path, tokens)
+                        with self.index.lock:
+                            self.index.sort_vocabulary()
+                    self.indexed.emit()
+        except Exception as e:
+            print(f"Error indexing files: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def add_stored(self, file_paths):
+        # Indexes what the metadata store already has; returns the rest.
+        if self.store is None:
+            return file_paths
+        missing = []
+        for file_path in file_paths:
+            try:
+                tokens = self.store.get_tokens(file_key(os.stat(file_path)))
+            except OSError:
+                continue
+            if tokens is None:
+                missing.append(file_path)
+            else:
+                self.index.extend(file_path, tokens)
+        return missing
+
+    def store_tokens(self, file_path, tokens):
+        if self.store is None:
+            return
+        try:
+            self.store.put_tokens(file_key(os.stat(file_path)), file_path, tokens)
+        except OSError:
+            pass
+
+    def finish(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.wait()
+
+class DebugOverlay(QLabel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 170);
+                color: #ECF0F1;
+                font-family: monospace;
+                font-size: 11px;
+                padding: 6px;
+                border-radius: 6px;
+            }
+        """)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.move(8, 8)
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    def refresh(self):
+        lines = [f"{'span':<16}{'n':>5}{'p50':>9}{'p99':>9}{'max':>9}  ms"]
+        for name, count, p50, p99, worst in instrument.rolling_stats():
+            lines.append(f"{name:<16}{count:>5}{p50:>9.1f}{p99:>9.1f}{worst:>9.1f}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.raise_()
+
+class DuplicateFinder(QThread):
+    duplicates_found = pyqtSignal(list)  # lists of paths with identical contents
+
+    def __init__(self, entries):
+        super().__init__()
+        self.entries = entries
 
+    @traced("duplicates")
     def run(self):
-        for file in os.listdir(self.desktop_path):
-            file_path = os.path.join(self.desktop_path, file)
-            if os.path.isfile(file_path):
-                self.file_loaded.emit(file, file_path)
+        try:
+            groups = find_duplicates(self.entries, HashCache(), stop=self.isInterruptionRequested)
+        except Exception as e:
+            print(f"Error looking for duplicates: {e}")
+            return
+        if not self.isInterruptionRequested():
+            self.duplicates_found.emit([[entry.path for entry in group] for group in groups])
 
 class RoundedWidget(QWidget):
     def __init__(self, parent=None):
@@ -34,9 +606,12 @@ class RoundedWidget(QWidget):
         painter.drawRoundedRect(self.rect(), 20, 20)
 
 class FileCard(QWidget):
-    def __init__(self, file_path):
+    def __init__(self, preview_engine, file_path=None):
         super().__init__()
-        self.file_path = file_path
+        self.preview_engine = preview_engine
+        self.preview_job = None
+        self.file_path = None
+        self.file_size = None
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
         self.layout.setSpacing(15)
@@ -51,7 +626,7 @@ class FileCard(QWidget):
             }
         """)
 
-        self.title = QLabel(os.path.basename(file_path))
+        self.title = QLabel()
         self.title.setStyleSheet("""
             font-size: 24px;
             font-weight: bold;
@@ -96,66 +671,55 @@ class FileCard(QWidget):
         self.file_info.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.file_info)
 
+        if file_path is not None:
+            self.set_file(file_path)
+
+    def set_file(self, file_path, file_size=None):
+        # Cards are recycled by MainWindow, so rebinding must reset everything
+        # the previous file left behind.
+        self.clear()
+        self.file_path = file_path
+        self.file_size = file_size
+        self.title.setText(os.path.basename(file_path))
         self.update_file_info()
 
+    def clear(self):
+        self.cancel_preview()
+        self.file_path = None
+        self.file_size = None
+        self.title.clear()
+        self.file_info.clear()
+        self.icon_label.clear()
+        self.preview_text.clear()
+
     def update_file_info(self):
         file_info = self.get_file_info()
         self.file_info.setText(f"{file_info['size']}")
         self.load_preview()
 
     def get_file_info(self):
-        file_stats = os.stat(self.file_path)
-        file_size = file_stats.st_size
-        
-        if file_size < 1024:
-            size_str = f"{file_size} B"
-        elif file_size < 1024 * 1024:
-            size_str = f"{file_size / 1024:.1f} KB"
-        else:
-            size_str = f"{file_size / (1024 * 1024):.1f} MB"
-        
+        # The scan already knows the size; only stat files that didn't come
+        # from it (e.g. ones restored by undo).
+        file_size = self.file_size
+        if file_size is None:
+            file_size = os.stat(self.file_path).st_size
+
         return {
             "name": os.path.basename(self.file_path),
-            "size": size_str,
+            "size": format_size(file_size),
         }
 
     def load_preview(self):
+        self.cancel_preview()
         file_extension = os.path.splitext(self.file_path)[1].lower()
-        
-        if file_extension in ['.png', '.jpg', '.jpeg']:
-            pixmap = QPixmap(self.file_path)
-            if not pixmap.isNull():
-                self.icon_label.setPixmap(pixmap.scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                self.icon_label.setVisible(True)
-                self.preview_text.setVisible(False)
-            else:
-                self.icon_label.setText("Error loading image")
-        elif file_extension == '.pdf':
-            try:
-                with fitz.open(self.file_path) as doc:
-                    text = ""
-                    for page in doc:
-                        text += page.get_text()
-                        if len(text) > 1000:
-                            break
-                    self.preview_text.setText(text[:1000] + "..." if len(text) > 1000 else text)
-                    self.icon_label.setVisible(False)
-                    self.preview_text.setVisible(True)
-            except Exception as e:
-                self.preview_text.setText(f"Error loading PDF: {str(e)}")
-                self.icon_label.setVisible(False)
-                self.preview_text.setVisible(True)
-        elif file_extension == '.docx':
-            try:
-                doc = Document(self.file_path)
-                text = "\n".join([para.text for para in doc.paragraphs])
-                self.preview_text.setText(text[:1000] + "..." if len(text) > 1000 else text)
-                self.icon_label.setVisible(False)
-                self.preview_text.setVisible(True)
-            except Exception as e:
-                self.preview_text.setText(f"Error loading DOCX: {str(e)}")
-                self.icon_label.setVisible(False)
-                self.preview_text.setVisible(True)
+
+        if file_extension in ASYNC_PREVIEW_EXTENSIONS:
+            # Decoding happens on the preview engine's pool; show a placeholder
+            # until apply_preview swaps the result in.
+            self.icon_label.setText("Loading preview...")
+            self.icon_label.setVisible(True)
+            self.preview_text.setVisible(False)
+            self.preview_job = self.preview_engine.request(self.file_path, self.apply_preview)
         else:
             icon = QFileIconProvider().icon(QFileInfo(self.file_path))
             pixmap = icon.pixmap(QSize(128, 128))
@@ -163,6 +727,33 @@ class FileCard(QWidget):
             self.icon_label.setVisible(True)
             self.preview_text.setVisible(False)
 
+    def cancel_preview(self):
+        if self.preview_job is not None:
+            self.preview_engine.cancel(self.preview_job)
+            self.preview_job = None
+
+    def apply_preview(self, result):
+        self.preview_job = None
+        kind, payload = result
+        if kind == "image":
+            self.icon_label.setPixmap(QPixmap.fromImage(payload))
+            self.icon_label.setVisible(True)
+            self.preview_text.setVisible(False)
+        elif kind == "text" or kind == "table":
+            # Plain text even if it looks like markup (.html, .xml files).
+            if kind == "table":
+                self.preview_text.setHtml(table_html(payload))
+            else:
+                self.preview_text.setPlainText(payload)
+            self.icon_label.clear()
+            self.icon_label.setVisible(False)
+            self.preview_text.setVisible(True)
+        else:
+            self.icon_label.setText(payload)
+            self.icon_label.setVisible(True)
+            self.preview_text.setVisible(False)
+        self.adjust_content_size()
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.adjust_content_size()
@@ -175,161 +766,261 @@ class FileCard(QWidget):
             icon_size = min(int(self.width() * 0.7), int(available_height * 0.8), 300)
             self.icon_label.setFixedSize(icon_size, icon_size)
 
-class MainWindow(QMainWindow):
-    def __init__(self):
+def grid_thumbnail(file_path, thumbnail_cache, preview=None):
+    # Worker thread, like render_preview. A card preview, in memory (preview)
+    # or on disk, is much cheaper to scale down than the original.
+    stat = os.stat(file_path)
+    image = cached_image(thumbnail_cache, file_path, stat, "grid")
+    if image is not None:
+        return image
+    image = preview if preview is not None else cached_image(thumbnail_cache, file_path, stat, "preview")
+    if image is not None:
+        image = image.scaled(GRID_THUMB_SIZE, GRID_THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    else:
+        with span("grid.thumbnail"):
+            image = load_scaled_image(file_path, GRID_THUMB_SIZE)
+        if image.isNull():
+            return image
+    if thumbnail_cache is not None:
+        thumbnail_cache.put(file_path, stat.st_size, stat.st_mtime_ns, image_to_bytes(image), "grid")
+    return image
+
+class ThumbnailSignals(QObject):
+    finished = pyqtSignal(int, list)
+
+class ThumbnailJob(QRunnable):
+    # One batch of grid thumbnails, reported back in a single signal. items
+    # are (path, remembered preview QImage or None) pairs.
+    def __init__(self, job_id, items, signals, thumbnail_cache):
         super().__init__()
-        self.setWindowTitle("Desktop File Swiper")
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #F5F5F5;
-            }
-            QWidget {
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        """)
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.items = items
+        self.signals = signals
+        self.thumbnail_cache = thumbnail_cache
+        self.cancelled = False
 
-        self.central_widget = QWidget()
-        self.setCentralWidget(self.central_widget)
-        self.layout = QVBoxLayout(self.central_widget)
-        self.layout.setSpacing(20)
-        self.layout.setContentsMargins(20, 20, 20, 20)
-
-        self.undo_button = QPushButton("Undo")
-        self.undo_button.clicked.connect(self.on_undo)
-        self.undo_button.setStyleSheet("""
-            QPushButton {
-                font-size: 18px;
-                font-weight: bold;
-                border-radius: 15px;
-                padding: 10px 20px;
-                background-color: #3498DB;
-                color: white;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #2980B9;
-            }
-            QPushButton:pressed {
-                background-color: #2573A7;
-            }
-        """)
-        self.undo_label = QLabel("↑ Up Arrow")
-        self.undo_label.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                color: #7F8C8D;
-                margin-top: 5px;
+    def run(self):
+        results = []
+        for file_path, preview in self.items:
+            if self.cancelled:
+                break
+            try:
+                image = grid_thumbnail(file_path, self.thumbnail_cache, preview)
+            except Exception:
+                image = QImage()
+            results.append((file_path, image))
+        self.signals.finished.emit(self.job_id, results)
+
+class QueueModel(QAbstractListModel):
+    # The queue as a list model for the grid. Views only ask for the cells
+    # they paint, so a thumbnail is requested the first time its cell is
+    # painted; requests are gathered for GRID_BATCH_MS and sent to the preview
+    # engine in batches, visible cells first and then GRID_LOOKAHEAD cells
+    # past them. Batches still waiting when the view has moved on are taken
+    # back.
+    def __init__(self, entries, engine, parent=None):
+        super().__init__(parent)
+        self.entries = entries
+        self.engine = engine
+        self.paths = []
+        self.rows = None  # path -> row, rebuilt on demand after changes
+        self.thumbnails = OrderedDict()  # path -> QPixmap, most recently painted last
+        self.failed = set()
+        self.icons = {}  # extension -> QIcon for files without a thumbnail
+        self.icon_provider = QFileIconProvider()
+
+        self.jobs = {}  # job id -> paths
+        self.loading = set()
+        self.wanted = {}  # paths painted without a thumbnail since the last flush, in paint order
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(GRID_BATCH_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_path = self.paths[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(file_path)
+        if role == Qt.DecorationRole:
+            pixmap = self.thumbnails.get(file_path)
+            if pixmap is not None:
+                self.thumbnails.move_to_end(file_path)
+                return pixmap
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension in IMAGE_EXTENSIONS and file_path not in self.failed:
+                self.want(file_path)
+            icon = self.icons.get(extension)
+            if icon is None:
+                icon = self.icons[extension] = self.icon_provider.icon(QFileInfo(file_path))
+            return icon
+        if role == Qt.ToolTipRole:
+            entry = self.entries.get(file_path)
+            if entry is not None:
+                return f"{os.path.basename(file_path)}\n{format_size(entry.size)}"
+        return None
+
+    def row_of(self, file_path):
+        if self.rows is None:
+            self.rows = {path: row for row, path in enumerate(self.paths)}
+        return self.rows.get(file_path)
+
+    def set_paths(self, paths):
+        # Removes and inserts row ranges where the change is a handful of
+        # them (a discarded selection, an undo, files arriving), so the view
+        # keeps its scroll position and selection; anything else resets.
+        if paths == self.paths:
+            return
+        self.rows = None
+        keep = set(paths)
+        old = self.paths
+        removed = [row for row, path in enumerate(old) if path not in keep]
+        if count_ranges(removed) > GRID_MAX_RANGES:
+            return self.reset_paths(paths)
+        present = set(old) - set(old[row] for row in removed)
+        if [path for path in paths if path in present] != [path for path in old if path in present] \
+                or count_ranges([row for row, path in enumerate(paths) if path not in present]) > GRID_MAX_RANGES:
+            return self.reset_paths(paths)
+
+        for first, last in reversed(list(iter_ranges(removed))):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del old[first:last + 1]
+            self.endRemoveRows()
+        row = 0
+        i = 0
+        while i < len(paths):
+            if row < len(old) and paths[i] == old[row]:
+                row += 1
+                i += 1
+                continue
+            start = i
+            while i < len(paths) and paths[i] not in present:
+                i += 1
+            self.beginInsertRows(QModelIndex(), row, row + i - start - 1)
+            old[row:row] = paths[start:i]
+            self.endInsertRows()
+            row += i - start
+
+    def reset_paths(self, paths):
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.endResetModel()
+
+    def want(self, file_path):
+        self.wanted[file_path] = None
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        wanted = [path for path in self.wanted if path not in self.thumbnails]
+        self.wanted = {}
+        for job_id, file_paths in list(self.jobs.items()):
+            if self.engine.cancel_thumbnails(job_id):
+                del self.jobs[job_id]
+                self.loading.difference_update(file_paths)
+        visible = [path for path in wanted if path not in self.loading]
+        rows = [row for row in map(self.row_of, wanted) if row is not None]
+        ahead = []
+        if rows:
+            for path in self.paths[max(rows) + 1:max(rows) + 1 + GRID_LOOKAHEAD]:
+                if (path not in self.thumbnails and path not in self.loading and path not in self.failed
+                        and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS):
+                    ahead.append(path)
+        self.start_jobs(visible, 1)
+        self.start_jobs(ahead, 0)
+
+    def start_jobs(self, file_paths, priority):
+        for start in range(0, len(file_paths), GRID_BATCH):
+            batch = file_paths[start:start + GRID_BATCH]
+            self.jobs[self.engine.request_thumbnails(batch, self.on_batch_finished, priority)] = batch
+            self.loading.update(batch)
+
+    def on_batch_finished(self, job_id, results):
+        file_paths = self.jobs.pop(job_id, None)
+        if file_paths is None:
+            return
+        self.loading.difference_update(file_paths)
+        for file_path, image in results:
+            if image.isNull():
+                self.failed.add(file_path)
+                continue
+            self.thumbnails[file_path] = QPixmap.fromImage(image)
+            row = self.row_of(file_path)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+        while len(self.thumbnails) > GRID_THUMBNAILS:
+            self.thumbnails.popitem(last=False)
+
+    def forget(self, file_path):
+        self.thumbnails.pop(file_path, None)
+        self.failed.discard(file_path)
+
+    def shutdown(self):
+        # The engine's own shutdown stops the jobs themselves.
+        self.flush_timer.stop()
+        self.jobs.clear()
+        self.loading.clear()
+
+def iter_ranges(rows):
+    # (first, last) runs of consecutive numbers in a sorted list.
+    first = last = None
+    for row in rows:
+        if last is not None and row == last + 1:
+            last = row
+            continue
+        if first is not None:
+            yield first, last
+        first = last = row
+    if first is not None:
+        yield first, last
+
+def count_ranges(rows):
+    return sum(1 for _ in iter_ranges(rows))
+
+class FileGrid(QListView):
+    # Icon-mode view over a QueueModel. Uniform, static cells let Qt place
+    # items arithmetically and paint only what is on screen.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setIconSize(QSize(GRID_THUMB_SIZE, GRID_THUMB_SIZE))
+        self.setGridSize(QSize(GRID_THUMB_SIZE + 24, GRID_THUMB_SIZE + 40))
+        self.setTextElideMode(Qt.ElideMiddle)
+        self.setWordWrap(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(GRID_THUMB_SIZE // 4)
+        self.setStyleSheet("""
+            QListView {
+                background-color: #FFFFFF;
+                border: 1px solid #D0D0D0;
+                border-radius: 10px;
             }
         """)
-        self.undo_label.setAlignment(Qt.AlignCenter)
-        
-        undo_layout = QVBoxLayout()
-        undo_layout.addWidget(self.undo_button)
-        undo_layout.addWidget(self.undo_label)
-        self.layout.addLayout(undo_layout, alignment=Qt.AlignRight)
-
-        self.stack = QStackedWidget()
-        self.layout.addWidget(self.stack, 1)
 
-        button_layout = QHBoxLayout()
-        self.discard_button = QPushButton("Put in Clutter")
-        self.keep_button = QPushButton("Keep on Desktop")
-        self.discard_button.clicked.connect(self.on_discard)
-        self.keep_button.clicked.connect(self.on_keep)
-        button_style = """
-            QPushButton {
-                font-size: 22px;
-                font-weight: bold;
-                border-radius: 25px;
-                padding: 15px 30px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: %s;
-            }
-            QPushButton:pressed {
-                background-color: %s;
-            }
-        """
-        self.discard_button.setStyleSheet(button_style % ("#E74C3C", "#C0392B") + "QPushButton { background-color: #FF4040; color: white; }")
-        self.keep_button.setStyleSheet(button_style % ("#F1C40F", "#F39C12") + "QPushButton { background-color: #FFC000; color: white; }")
+    def selected_paths(self):
+        paths = self.model().paths
+        return {paths[index.row()] for index in self.selectionModel().selectedIndexes()}
 
-        button_layout.addWidget(self.discard_button)
-        button_layout.addWidget(self.keep_button)
-        self.layout.addLayout(button_layout)
+    def select_row(self, row):
+        model = self.model()
+        if not model.paths:
+            return
+        index = model.index(min(row, len(model.paths) - 1))
+        self.selectionModel().setCurrentIndex(index, QItemSelectionModel.ClearAndSelect)
+        self.scrollTo(index)
 
-        # Create and style labels for keyboard commands
-        self.discard_label = QLabel("← Left Arrow")
-        self.keep_label = QLabel("→ Right Arrow")
-        label_style = """
-            QLabel {
-                font-size: 14px;
-                color: #7F8C8D;
-                margin-top: 5px;
-            }
-        """
-        self.discard_label.setStyleSheet(label_style)
-        self.keep_label.setStyleSheet(label_style)
-        self.discard_label.setAlignment(Qt.AlignCenter)
-        self.keep_label.setAlignment(Qt.AlignCenter)
-
-        # Add labels under the buttons
-        label_layout = QHBoxLayout()
-        label_layout.addWidget(self.discard_label)
-        label_layout.addWidget(self.keep_label)
-        self.layout.addLayout(label_layout)
-
-        self.desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        self.clutter_folder = os.path.join(self.desktop_path, "Desktop Clutter")
-        if not os.path.exists(self.clutter_folder):
-            os.makedirs(self.clutter_folder)
-
-        self.file_loader = FileLoader(self.desktop_path)
-        self.file_loader.file_loaded.connect(self.add_file)
-        self.file_loader.start()
-
-        self.undo_stack = []
-        self.current_files = []
-
-        QApplication.instance().installEventFilter(self)
-
-    # ... (keep the rest of the methods as they were in the previous version)
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.adjust_layout()
-
-    def adjust_layout(self):
-        for i in range(self.stack.count()):
-            widget = self.stack.widget(i)
-            if isinstance(widget, FileCard):
-                widget.adjust_content_size()
-
-        # Adjust button sizes
-        button_width = max(int(self.width() * 0.4), 200)
-        button_height = max(int(self.height() * 0.1), 50)
-        self.discard_button.setFixedSize(button_width, button_height)
-        self.keep_button.setFixedSize(button_width, button_height)
-
-        # Adjust undo button size
-        undo_width = max(int(self.width() * 0.2), 100)
-        undo_height = max(int(self.height() * 0.06), 30)
-        self.undo_button.setFixedSize(undo_width, undo_height)
-
-        # Adjust font sizes
-        base_font_size = max(int(self.width() * 0.02), 12)
-        self.discard_button.setStyleSheet(self.discard_button.styleSheet() + f"font-size: {base_font_size}px;")
-        self.keep_button.setStyleSheet(self.keep_button.styleSheet() + f"font-size: {base_font_size}px;")
-        self.undo_button.setStyleSheet(self.undo_button.styleSheet() + f"font-size: {int(base_font_size * 0.8)}px;")
-
-        # Adjust label font sizes
-        label_font_size = max(int(base_font_size * 0.7), 10)
-        label_style = f"font-size: {label_font_size}px; color: #7F8C8D; margin-top: 5px;"
-        self.discard_label.setStyleSheet(label_style)
-        self.keep_label.setStyleSheet(label_style)
-        self.undo_label.setStyleSheet(label_style)
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, order=None, watch=True, clutter_folder=None, depth=0, preview_memory_mb=PREVIEW_MEMORY_MB, grid=False):
         super().__init__()
         self.setWindowTitle("Desktop File Swiper")
         self.setStyleSheet("""
@@ -345,67 +1036,81 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
         self.layout = QVBoxLayout(self.central_widget)
 
+        top_layout = QHBoxLayout()
+
+        # Shown only while the current file has known copies on the desktop
+        self.duplicates_container = QWidget()
+        duplicates_layout = QVBoxLayout(self.duplicates_container)
+        self.duplicates_button = QPushButton("Discard Duplicates")
+        self.duplicates_button.clicked.connect(self.on_discard_duplicates)
+        self.duplicates_label = QLabel("↓ Down Arrow")
+        self.duplicates_label.setAlignment(Qt.AlignCenter)
+        duplicates_layout.addWidget(self.duplicates_button)
+        duplicates_layout.addWidget(self.duplicates_label)
+        self.duplicates_container.setVisible(False)
+        top_layout.addWidget(self.duplicates_container, alignment=Qt.AlignLeft)
+        # Bulk keep/discard by type, extension and age (G)
+        group_container = QWidget()
+        group_layout = QVBoxLayout(group_container)
+        self.group_button = QPushButton("Group")
+        self.group_menu = QMenu(self.group_button)
+        self.group_menu.aboutToShow.connect(self.build_group_menu)
+        self.group_button.setMenu(self.group_menu)
+        self.group_label = QLabel("G")
+        self.group_label.setAlignment(Qt.AlignCenter)
+        group_layout.addWidget(self.group_button)
+        group_layout.addWidget(self.group_label)
+        top_layout.addWidget(group_container, alignment=Qt.AlignLeft)
+        # Switches between one card at a time and the thumbnail grid (Tab)
+        view_container = QWidget()
+        view_layout = QVBoxLayout(view_container)
+        self.view_button = QPushButton("Grid")
+        self.view_button.clicked.connect(self.toggle_grid)
+        self.view_label = QLabel("Tab")
+        self.view_label.setAlignment(Qt.AlignCenter)
+        view_layout.addWidget(self.view_button)
+        view_layout.addWidget(self.view_label)
+        top_layout.addWidget(view_container, alignment=Qt.AlignLeft)
+
+        # Narrows the queue to files whose name or contents match (Ctrl+F)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search names and contents (Ctrl+F)")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                font-size: 14px;
+                padding: 6px 10px;
+                border: 1px solid #D0D0D0;
+                border-radius: 10px;
+                background-color: #FFFFFF;
+            }
+        """)
+        top_layout.addWidget(self.search_box, 1)
+
         # Undo button and label
         undo_container = QWidget()
         undo_layout = QVBoxLayout(undo_container)
         self.undo_button = QPushButton("Undo")
         self.undo_button.clicked.connect(self.on_undo)
-        self.undo_button.setStyleSheet("""
-            QPushButton {
-                font-size: 18px;
-                font-weight: bold;
-                border-radius: 15px;
-                padding: 10px 20px;
-                background-color: #3498DB;
-                color: white;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #2980B9;
-            }
-            QPushButton:pressed {
-                background-color: #2573A7;
-            }
-        """)
         self.undo_label = QLabel("↑ Up Arrow")
-        self.undo_label.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                color: #7F8C8D;
-                margin-top: 5px;
-            }
-        """)
         self.undo_label.setAlignment(Qt.AlignCenter)
         undo_layout.addWidget(self.undo_button)
         undo_layout.addWidget(self.undo_label)
         undo_container.setLayout(undo_layout)
-        self.layout.addWidget(undo_container, alignment=Qt.AlignRight)
+        top_layout.addWidget(undo_container, alignment=Qt.AlignRight)
+        self.layout.addLayout(top_layout)
 
         self.stack = QStackedWidget()
         self.layout.addWidget(self.stack, 1)
+        self.grid = FileGrid()
+        self.grid.setVisible(False)
+        self.layout.addWidget(self.grid, 1)
 
         self.button_layout = QHBoxLayout()
         self.discard_button = QPushButton("Put in Clutter")
         self.keep_button = QPushButton("Keep on Desktop")
         self.discard_button.clicked.connect(self.on_discard)
         self.keep_button.clicked.connect(self.on_keep)
-        button_style = """
-            QPushButton {
-                font-size: 22px;
-                font-weight: bold;
-                border-radius: 25px;
-                padding: 15px 30px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: %s;
-            }
-            QPushButton:pressed {
-                background-color: %s;
-            }
-        """
-        self.discard_button.setStyleSheet(button_style % ("#E74C3C", "#C0392B") + "QPushButton { background-color: #FF4040; color: white; }")
-        self.keep_button.setStyleSheet(button_style % ("#F1C40F", "#F39C12") + "QPushButton { background-color: #FFC000; color: white; }")
 
         # Create vertical layouts for buttons and their labels
         discard_layout = QVBoxLayout()
@@ -418,15 +1123,6 @@ class MainWindow(QMainWindow):
         # Create and style labels for keyboard commands
         self.discard_label = QLabel("← Left Arrow")
         self.keep_label = QLabel("→ Right Arrow")
-        label_style = """
-            QLabel {
-                font-size: 14px;
-                color: #7F8C8D;
-                margin-top: 5px;
-            }
-        """
-        self.discard_label.setStyleSheet(label_style)
-        self.keep_label.setStyleSheet(label_style)
         self.discard_label.setAlignment(Qt.AlignCenter)
         self.keep_label.setAlignment(Qt.AlignCenter)
 
@@ -440,19 +1136,107 @@ class MainWindow(QMainWindow):
 
         self.layout.addLayout(self.button_layout)
 
-        self.desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        self.clutter_folder = os.path.join(self.desktop_path, "Desktop Clutter")
-        if not os.path.exists(self.clutter_folder):
-            os.makedirs(self.clutter_folder)
-
-        self.file_loader = FileLoader(self.desktop_path)
-        self.file_loader.file_loaded.connect(self.add_file)
-        self.file_loader.start()
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("""
+            QLabel {
+                font-size: 12px;
+                color: #7F8C8D;
+            }
+        """)
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.status_label)
+
+        # Font sizes follow the window width. Stylesheets are rebuilt from the
+        # templates only when a size actually changes (see apply_font_size).
+        self.base_font_size = None
+        self.label_font_size = 14
+        self.apply_font_size(22)
+        self.layout_timer = QTimer(self)
+        self.layout_timer.setSingleShot(True)
+        self.layout_timer.setInterval(LAYOUT_DEBOUNCE_MS)
+        self.layout_timer.timeout.connect(self.adjust_layout)
 
+        self.desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        self.clutter_folder = clutter_folder or os.path.join(self.desktop_path, "Desktop Clutter")
+        self.order = order
+        self.watch = watch
+        self.depth = depth
+        self.started_at = time.perf_counter()
+        self.first_card_at = None
+
+        # The queue is just paths, indexed like entries so group actions can
+        # find and take out their files directly. Only the first few get a
+        # FileCard, and those cards are recycled as the user swipes (see
+        # sync_cards).
         self.undo_stack = []
-        self.current_files = []
+        self.entries = FileIndex()
+        self.current_files = FileQueue(self.entries)
+        self.cards = {}
+        self.spare_cards = []
+        # Extracted previews and index words from earlier sessions; loaded by
+        # its own thread once start_loading opens it.
+        self.metadata_store = MetadataStore()
+        self.preview_engine = PreviewEngine(ThumbnailCache(), self, preview_memory_mb * 1024 * 1024, self.metadata_store)
+
+        # The grid shows the same queue, selection at a time; it is only kept
+        # in step with current_files while it is showing (see update_grid).
+        self.grid_mode = False
+        self.grid_model = QueueModel(self.entries, self.preview_engine, self)
+        self.grid.setModel(self.grid_model)
+
+        # Previews past the card window are decoded ahead of the user; how far
+        # ahead follows the swipe rate (see update_prefetch).
+        self.prefetch_jobs = {}
+        self.last_swipe_at = None
+        self.swipe_interval = None  # moving average, seconds
+
+        # Discards are moved in the background. Until a move finishes, its
+        # job id is kept in pending_moves (by Clutter path) so undo can cancel
+        # it outright if it hasn't started yet.
+        self.move_queue = MoveQueue(self)
+        self.move_queue.move_progress.connect(self.on_move_progress)
+        self.move_queue.start()
+        self.pending_moves = {}
+        self.discarded_entries = {}
+
+        # While a search is active the queue holds only matches; the rest wait
+        # in filtered_out, until it is cleared. Both stay sorted by
+        # queue_order, a number per path: new files get the next one at the
+        # back, files put back at the front by undo one below the lowest. So
+        # the two merge back into the one queue order, whatever was searched.
+        self.queue_order = {}
+        self.next_order = 0
+        self.front_order = 0
+        self.search_index = SearchIndex()
+        self.indexer = SearchIndexer(self.search_index, self.metadata_store, self)
+        self.indexer.indexed.connect(self.on_indexed)
+        self.search_query = ""
+        self.filtered_out = FileQueue(self.entries)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_box.textChanged.connect(self.search_timer.start)
+
+        # Groups of identical files, by path, once the scan has been hashed.
+        self.duplicates = {}
+        self.duplicate_finder = None
+
+        self.journal = Journal()
+        self.watcher = None
+        self.file_loader = None
+        # Everything that touches the disk waits until the event loop is
+        # running, so the window paints before any of it happens.
+        QTimer.singleShot(0, self.start_loading)
+
+        # Rolling span latencies over the window when CLEAN_DESKTOP_TRACE is set
+        # (F12 toggles it).
+        self.debug_overlay = None
+        if instrument.ENABLED:
+            self.debug_overlay = DebugOverlay(self.central_widget)
 
         self.is_fullscreen = False
+        self.start_in_grid = grid
         QApplication.instance().installEventFilter(self)
 
         # Set initial size based on screen size
@@ -464,63 +1248,530 @@ class MainWindow(QMainWindow):
         height = int(screen.height() * 0.8)
         self.setGeometry((screen.width() - width) // 2, (screen.height() - height) // 2, width, height)
 
-    def add_file(self, file_name, file_path):
-        card = FileCard(file_path)
-        self.stack.addWidget(card)
-        self.current_files.append(file_path)
-        if self.stack.count() == 1:
-            self.stack.setCurrentIndex(0)
+    def start_loading(self):
+        # Decisions from earlier sessions: kept files are skipped by add_files
+        # and the recent undo history comes back.
+        self.metadata_store.open()
+        self.journal.open()
+        self.restore_undo_history()
+
+        # A fresh account may not have a desktop folder yet.
+        try:
+            os.makedirs(self.desktop_path, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating {self.desktop_path}: {e}")
+            return
+
+        # Started before the scan so nothing created in between is missed;
+        # add_files skips anything both of them report.
+        if self.watch:
+            self.watcher = DesktopWatcher(self.desktop_path, self)
+            self.watcher.files_changed.connect(self.apply_desktop_changes)
+
+        # The Clutter folder usually lives on the desktop; never offer its
+        # contents back for sorting.
+        self.indexer.start()
+        self.file_loader = FileLoader(self.desktop_path, self.order, self.depth, (self.clutter_folder,))
+        self.file_loader.files_loaded.connect(self.add_files)
+        self.file_loader.finished.connect(self.start_duplicate_search)
+        self.file_loader.start()
 
+    def start_duplicate_search(self):
+        self.duplicate_finder = DuplicateFinder(list(self.entries.values()))
+        self.duplicate_finder.duplicates_found.connect(self.set_duplicates)
+        self.duplicate_finder.start()
+
+    def set_duplicates(self, groups):
+        self.duplicates = {path: group for group in groups for path in group}
+        self.update_duplicates_button()
+
+    def restore_undo_history(self):
+        # undo_stack and journal.history have to stay step-for-step aligned,
+        # since every undo pops one of each.
+        for record in self.journal.history[-UNDO_HISTORY:]:
+            if record["op"] == "keep":
+                self.undo_stack.append(("keep", record["path"]))
+            elif record["op"] == "batch":
+                for discard in record["discards"]:
+                    self.discarded_entries[discard["to"]] = FileEntry(
+                        discard["path"], os.path.basename(discard["path"]), discard["size"], discard["mtime_ns"])
+                self.undo_stack.append(("batch", [discard["to"] for discard in record["discards"]]))
+            elif record["op"] == "keeps":
+                self.undo_stack.append(("keeps", [keep["path"] for keep in record["keeps"]]))
+            else:
+                entry = FileEntry(record["path"], os.path.basename(record["path"]), record["size"], record["mtime_ns"])
+                self.discarded_entries[record["to"]] = entry
+                self.undo_stack.append(("discard", record["to"]))
+
+    def add_files(self, entries):
+        # self.entries covers every desktop file already queued or decided, so
+        # it doubles as the "seen" set for the watcher and the scan.
+        needs_cards = len(self.current_files) < CARD_WINDOW
+        queue = self.filtered_out if self.search_query else self.current_files
+        added = []
+        for entry in entries:
+            if entry.path in self.entries:
+                continue
+            self.entries[entry.path] = entry
+            added.append(entry)
+            if not self.journal.is_kept(entry.path, entry.size, entry.mtime_ns):
+                self.queue_order[entry.path] = self.next_order
+                self.next_order += 1
+                queue.append(entry.path)
+        if added:
+            self.indexer.add(added)
+        if needs_cards:
+            self.sync_cards()
+        else:
+            self.update_grid()
+
+    def apply_desktop_changes(self, added, removed):
+        # The watcher only sees the top level, so with subfolders in the queue
+        # a removed name may be a folder taking queued files with it. (Folders
+        # that still exist are reported as removed too, being non-files.)
+        changed = False
+        for file_path in removed:
+            if self.depth > 0 and not os.path.isdir(file_path):
+                prefix = file_path + os.sep
+                inside = [path for path in self.entries if path.startswith(prefix)]
+                if inside:
+                    self.unqueue(inside)
+                    for path in inside:
+                        del self.entries[path]
+                    changed = True
+            if self.entries.pop(file_path, None) is None:
+                continue
+            self.preview_engine.forget(file_path)
+            self.grid_model.forget(file_path)
+            self.unqueue([file_path])
+            changed = True
+
+        new_entries = []
+        changed_entries = []
+        for entry in added:
+            if entry.path in self.entries:
+                self.entries[entry.path] = entry
+                self.current_files.refresh(entry)
+                self.filtered_out.refresh(entry)
+                self.preview_engine.forget(entry.path)
+                self.grid_model.forget(entry.path)
+                changed_entries.append(entry)
+            else:
+                new_entries.append(entry)
+        if changed_entries:
+            self.indexer.add(changed_entries)
+        self.add_files(new_entries)
+
+        if changed:
+            self.sync_cards()
+
+    @traced("cards.sync")
+    def sync_cards(self):
+        wanted = list(islice(self.current_files, CARD_WINDOW))
+        # Keep the last kept file's card around so undoing a keep is instant.
+        if self.undo_stack and self.undo_stack[-1][0] == "keep" and self.undo_stack[-1][1] in self.entries:
+            wanted.append(self.undo_stack[-1][1])
+
+        for file_path in list(self.cards):
+            if file_path not in wanted:
+                card = self.cards.pop(file_path)
+                card.clear()
+                self.spare_cards.append(card)
+
+        for file_path in wanted:
+            if file_path not in self.cards:
+                if self.spare_cards:
+                    card = self.spare_cards.pop()
+                else:
+                    card = FileCard(self.preview_engine)
+                    self.stack.addWidget(card)
+                entry = self.entries.get(file_path)
+                card.set_file(file_path, entry.size if entry is not None else None)
+                self.cards[file_path] = card
+
+        self.update_duplicates_button()
+        self.update_prefetch()
+        self.update_grid()
+        if self.current_files:
+            self.stack.setCurrentWidget(self.cards[self.current_files[0]])
+            if self.first_card_at is None:
+                self.first_card_at = time.perf_counter()
+                # Only now, so the imports don't compete with startup for the GIL.
+                threading.Thread(target=warm_backends, name="warm-backends", daemon=True).start()
+
+    def prefetch_depth(self):
+        # Enough previews ahead to cover one render time at the current swipe
+        # rate, twice over, within half the memory budget (the other half is
+        # for undo targets and whatever was seen recently).
+        engine = self.preview_engine
+        depth = PREFETCH_MIN
+        if self.swipe_interval and engine.render_seconds:
+            depth = max(depth, CARD_WINDOW + 2 * math.ceil(engine.render_seconds / self.swipe_interval))
+        average = engine.average_bytes()
+        if average:
+            depth = min(depth, int(engine.memory_budget / 2 / average))
+        return max(min(depth, PREFETCH_MAX), CARD_WINDOW)
+
+    def update_prefetch(self):
+        wanted = {}
+        for distance, file_path in enumerate(islice(self.current_files, CARD_WINDOW, self.prefetch_depth())):
+            if os.path.splitext(file_path)[1].lower() in ASYNC_PREVIEW_EXTENSIONS:
+                wanted[file_path] = distance
+        for file_path in list(self.prefetch_jobs):
+            if file_path not in wanted:
+                self.preview_engine.cancel_prefetch(self.prefetch_jobs.pop(file_path))
+        for file_path, distance in wanted.items():
+            if file_path not in self.prefetch_jobs:
+                job_id = self.preview_engine.prefetch(file_path, -1 - distance)
+                if job_id is not None:
+                    self.prefetch_jobs[file_path] = job_id
+
+        # Keep what the latest undo steps would bring back.
+        warm = []
+        for action, target in self.undo_stack[-UNDO_WARM_STEPS:]:
+            targets = target if isinstance(target, list) else [target]
+            for file_path in targets[:CARD_WINDOW]:
+                entry = self.discarded_entries.get(file_path)
+                warm.append(entry.path if entry is not None else file_path)
+        self.preview_engine.touch(warm)
+
+    def record_swipe(self):
+        now = time.perf_counter()
+        if self.last_swipe_at is not None and now - self.last_swipe_at < SWIPE_IDLE_SECONDS:
+            interval = now - self.last_swipe_at
+            if self.swipe_interval is None:
+                self.swipe_interval = interval
+            else:
+                self.swipe_interval = 0.7 * self.swipe_interval + 0.3 * interval
+        self.last_swipe_at = now
+
+    @traced("swipe.discard")
     def on_discard(self):
+        if self.grid_mode:
+            return self.on_grid_action(self.discard_group)
+        self.record_swipe()
         self.move_file_to_clutter()
         self.move_to_next_file()
 
+    @traced("swipe.keep")
     def on_keep(self):
+        if self.grid_mode:
+            return self.on_grid_action(self.keep_group)
+        self.record_swipe()
         if self.current_files:
-            kept_file = self.current_files.pop(0)
+            kept_file = self.current_files.popleft()
+            entry = self.entries[kept_file]
+            self.journal.record_keep(kept_file, entry.size, entry.mtime_ns)
             self.undo_stack.append(("keep", kept_file))
         self.move_to_next_file()
 
+    @traced("swipe.undo")
     def on_undo(self):
         if self.undo_stack:
             action, file_path = self.undo_stack.pop()
+            self.journal.record_undo()
             if action == "discard":
-                file_name = os.path.basename(file_path)
-                new_path = os.path.join(self.desktop_path, file_name)
-                try:
-                    shutil.move(file_path, new_path)
-                    print(f"Moved {file_name} back to Desktop")
-                    self.add_file(file_name, new_path)
-                except Exception as e:
-                    print(f"Error moving file back: {str(e)}")
-            elif action == "keep":
-                self.current_files.insert(0, file_path)
-                card = FileCard(file_path)
-                self.stack.insertWidget(0, card)
-                self.stack.setCurrentIndex(0)
+                self.restore_discarded(file_path)
+                self.sync_cards()
+            elif action == "batch":
+                self.queue_restored([self.restore_discarded(new_path, queue=False) for new_path in file_path])
+                self.sync_cards()
+            elif action == "keeps":
+                self.queue_restored([kept_path for kept_path in file_path if kept_path in self.entries])
+                self.sync_cards()
+            elif action == "keep" and file_path in self.entries:
+                # Files deleted since they were kept have left self.entries;
+                # their undo step is simply used up.
+                self.queue_front(file_path)
+                self.sync_cards()
+
+    def restore_discarded(self, new_path, queue=True):
+        # Undoes one discard: cancels its move if it hasn't started, otherwise
+        # moves the file back, and puts it at the front of the queue (or
+        # leaves that to the caller). Returns the original path.
+        entry = self.discarded_entries.pop(new_path)
+        job_id = self.pending_moves.pop(new_path, None)
+        if job_id is None or not self.move_queue.cancel(job_id):
+            self.move_queue.submit(new_path, entry.path, lambda error: self.on_restore_moved(entry, error))
+        self.update_move_status()
+        self.entries[entry.path] = entry
+        if queue:
+            self.queue_front(entry.path)
+        return entry.path
+
+    def queue_restored(self, file_paths):
+        # Group undo: the files go back where they were in the queue rather
+        # than in front of the file being decided on. Ones with no place yet
+        # (discarded in an earlier session) go in front, in their order.
+        for file_path in reversed(file_paths):
+            if file_path not in self.queue_order:
+                self.front_order -= 1
+                self.queue_order[file_path] = self.front_order
+        key = self.queue_order.__getitem__
+        self.current_files = FileQueue(self.entries, heapq.merge(self.current_files, sorted(file_paths, key=key), key=key))
+
+    def queue_front(self, file_path):
+        self.front_order -= 1
+        self.queue_order[file_path] = self.front_order
+        self.current_files.appendleft(file_path)
 
     def move_file_to_clutter(self):
         if self.current_files:
-            file_path = self.current_files.pop(0)
-            file_name = os.path.basename(file_path)
-            new_path = os.path.join(self.clutter_folder, file_name)
-            
-            try:
-                shutil.move(file_path, new_path)
-                print(f"Moved {file_name} to Desktop Clutter folder")
-                self.undo_stack.append(("discard", new_path))
-            except Exception as e:
-                print(f"Error moving file: {str(e)}")
+            file_path = self.current_files.popleft()
+            entry = self.entries.pop(file_path)
+            new_path = self.submit_discard(entry)
+            self.journal.record_discard(file_path, new_path, entry.size, entry.mtime_ns)
+            self.undo_stack.append(("discard", new_path))
+
+    def submit_discard(self, entry):
+        # Files from subfolders keep their place in the tree under Clutter
+        # (MoveQueue creates the folders), and undo moves them back to
+        # entry.path, recreating the original folder if it has gone.
+        relative = os.path.relpath(entry.path, self.desktop_path)
+        if relative.startswith(os.pardir):
+            relative = os.path.basename(entry.path)
+        new_path = self.clutter_target(os.path.join(self.clutter_folder, relative))
+        self.discarded_entries[new_path] = entry
+        self.pending_moves[new_path] = self.move_queue.submit(
+            entry.path, new_path, lambda error: self.on_discard_moved(new_path, error))
+        return new_path
+
+    def clutter_target(self, new_path):
+        # Never the name of a file already in Clutter, or of one on its way
+        # there: moving over it would lose that file and make its undo bring
+        # back the wrong one. Numbered like headless.plan_targets.
+        stem, ext = os.path.splitext(new_path)
+        counter = 1
+        while new_path in self.discarded_entries or os.path.lexists(new_path):
+            new_path = f"{stem} ({counter}){ext}"
+            counter += 1
+        return new_path
+
+    def duplicates_of_current(self):
+        # Other copies of the current file that are still on the desktop,
+        # unchanged since they were hashed and not already kept.
+        if not self.current_files:
+            return []
+        current = self.current_files[0]
+        copies = []
+        for file_path in self.duplicates.get(current, ()):
+            entry = self.entries.get(file_path)
+            if file_path == current or entry is None:
+                continue
+            if self.journal.is_kept(file_path, entry.size, entry.mtime_ns):
+                continue
+            copies.append(entry)
+        return copies
+
+    def update_duplicates_button(self):
+        count = len(self.duplicates_of_current())
+        if count:
+            self.duplicates_button.setText(f"Discard {count} Duplicate{'s' if count > 1 else ''}")
+        self.duplicates_container.setVisible(count > 0)
+
+    @traced("swipe.duplicates")
+    def on_discard_duplicates(self):
+        # Moves every other copy of the current file to Clutter as one undo
+        # step; the current file stays up for its own decision.
+        self.discard_group(self.duplicates_of_current())
+
+    def discard_group(self, entries):
+        if not entries:
+            return
+        discarded = set()
+        records = []
+        for entry in entries:
+            self.entries.pop(entry.path)
+            discarded.add(entry.path)
+            new_path = self.submit_discard(entry)
+            records.append((entry.path, new_path, entry.size, entry.mtime_ns))
+        self.unqueue(discarded)
+        self.journal.record_batch(records)
+        self.undo_stack.append(("batch", [record[1] for record in records]))
+        self.move_to_next_file()
+
+    def keep_group(self, entries):
+        if not entries:
+            return
+        self.unqueue({entry.path for entry in entries})
+        self.journal.record_keeps([(entry.path, entry.size, entry.mtime_ns) for entry in entries])
+        self.undo_stack.append(("keeps", [entry.path for entry in entries]))
+        self.move_to_next_file()
+
+    def unqueue(self, paths):
+        # Decided files leave the queue whether or not they match the search,
+        # or clearing it would bring them back.
+        for path in paths:
+            self.current_files.discard(path)
+            self.filtered_out.discard(path)
+
+    def queued_group(self, paths):
+        # Queue order, so undo puts them back the way they were.
+        queued = [path for path in paths if path in self.current_files]
+        return [self.entries[path] for path in sorted(queued, key=self.queue_order.__getitem__)]
+
+    def build_group_menu(self):
+        # Groups come from the queue's own index, each looked up from its
+        # smallest bucket; nothing is statted, rescanned or walked in full.
+        self.group_menu.clear()
+        queued = self.current_files.index
+        criteria = [(label, {"kinds": [kind]}) for label, kind in GROUP_KINDS]
+        extensions = sorted(queued.by_extension, key=lambda ext: -len(queued.by_extension[ext]))
+        for extension in extensions[:GROUP_EXTENSIONS]:
+            if extension:
+                criteria.append((f"{extension} files", {"extensions": [extension]}))
+        categories = []
+        for label, selection in criteria:
+            paths = queued.select(**selection)
+            if paths:
+                ages = [(age_label, queued.select(ages=buckets, **selection)) for age_label, buckets in GROUP_AGES]
+                categories.append((label, paths, ages))
+        if queued:
+            ages = [(age_label, queued.select(ages=buckets)) for age_label, buckets in GROUP_AGES]
+            categories.append(("All files", None, ages))
+
+        for title, handler in (("Put in Clutter", self.discard_group), ("Keep on Desktop", self.keep_group)):
+            action_menu = self.group_menu.addMenu(title)
+            for label, paths, ages in categories:
+                if paths is None:
+                    category_menu = action_menu.addMenu(f"{label} ({len(queued)})")
+                else:
+                    category_menu = action_menu.addMenu(f"{label} ({len(paths)})")
+                    category_menu.addAction(f"All ({len(paths)})").triggered.connect(
+                        lambda checked=False, paths=paths, handler=handler: handler(self.queued_group(paths)))
+                for age_label, group in ages:
+                    if group:
+                        category_menu.addAction(f"{age_label} ({len(group)})").triggered.connect(
+                            lambda checked=False, group=group, handler=handler: handler(self.queued_group(group)))
+        if not queued:
+            self.group_menu.addAction("Nothing left to sort").setEnabled(False)
+
+    def on_discard_moved(self, new_path, error):
+        self.pending_moves.pop(new_path, None)
+        file_name = os.path.basename(new_path)
+        if error is None:
+            print(f"Moved {file_name} to Desktop Clutter folder")
+        else:
+            print(f"Error moving file: {error}")
+            # Nothing moved, so there is nothing to undo. The file goes back in
+            # the queue unless it has gone from the desktop in the meantime.
+            self.forget_undo_step(new_path)
+            self.journal.record_failed(new_path)
+            entry = self.discarded_entries.pop(new_path, None)
+            if entry is not None and os.path.exists(entry.path):
+                self.add_files([entry])
+            elif entry is not None:
+                self.preview_engine.forget(entry.path)
+                self.grid_model.forget(entry.path)
+        self.update_move_status()
+
+    def forget_undo_step(self, new_path):
+        # Mirrors what journal.record_failed does to the journal's history.
+        for i in range(len(self.undo_stack) - 1, -1, -1):
+            action, target = self.undo_stack[i]
+            if action == "discard" and target == new_path:
+                del self.undo_stack[i]
+                return
+            if action == "batch" and new_path in target:
+                target.remove(new_path)
+                if not target:
+                    del self.undo_stack[i]
+                return
+
+    def on_restore_moved(self, entry, error):
+        file_name = os.path.basename(entry.path)
+        # If the discard itself failed the file never left, which is fine too.
+        if error is None or os.path.exists(entry.path):
+            print(f"Moved {file_name} back to Desktop")
+            card = self.cards.get(entry.path)
+            if card is not None:
+                card.load_preview()
+        else:
+            print(f"Error moving file back: {error}")
+            queued = entry.path in self.current_files
+            self.unqueue([entry.path])
+            self.entries.pop(entry.path, None)
+            if queued:
+                self.sync_cards()
+        self.update_move_status()
+
+    def on_move_progress(self, file_name, done, total):
+        if total:
+            self.status_label.setText(f"Moving {file_name}... {done * 100 // total}%")
+
+    def update_move_status(self):
+        if self.move_queue.is_idle():
+            self.status_label.clear()
+
+    def apply_search(self):
+        # Re-splits the whole queue (matches first, in queue order) each time,
+        # so it also picks up files indexed since the last run.
+        self.search_query = self.search_box.text().strip()
+        matches = self.search_index.search(self.search_query) if self.search_query else None
+        if matches is None:
+            self.search_query = ""
+        combined = list(heapq.merge(self.current_files, self.filtered_out, key=self.queue_order.__getitem__))
+        if matches is None:
+            self.current_files = FileQueue(self.entries, combined)
+            self.filtered_out = FileQueue(self.entries)
+        else:
+            self.current_files = FileQueue(self.entries, (path for path in combined if path in matches))
+            self.filtered_out = FileQueue(self.entries, (path for path in combined if path not in matches))
+        if self.search_query and not self.current_files:
+            self.status_label.setText(f"No files match \"{self.search_query}\"")
+        elif self.move_queue.is_idle():
+            self.status_label.clear()
+        self.sync_cards()
+
+    def on_indexed(self):
+        if self.search_query:
+            self.search_timer.start()
 
     def move_to_next_file(self):
-        if self.stack.count() > 0:
-            self.stack.removeWidget(self.stack.widget(0))
-        
-        if self.stack.count() > 0:
-            self.stack.setCurrentIndex(0)
+        if not self.current_files and self.filtered_out:
+            # Every match has been dealt with; go back to the full queue.
+            self.search_box.clear()
+            self.apply_search()
+        if self.current_files:
+            self.sync_cards()
         else:
             self.close()
 
+    def toggle_grid(self):
+        self.grid_mode = not self.grid_mode
+        self.stack.setVisible(not self.grid_mode)
+        self.grid.setVisible(self.grid_mode)
+        self.view_button.setText("Cards" if self.grid_mode else "Grid")
+        # Arrow keys move around the grid, so the actions get other keys there.
+        if self.grid_mode:
+            self.discard_label.setText("Delete")
+            self.keep_label.setText("Enter")
+            self.undo_label.setText("Ctrl+Z")
+            self.update_grid()
+            self.grid.setFocus()
+        else:
+            self.discard_label.setText("← Left Arrow")
+            self.keep_label.setText("→ Right Arrow")
+            self.undo_label.setText("↑ Up Arrow")
+            self.setFocus()
+
+    def update_grid(self):
+        if self.grid_mode:
+            self.grid_model.set_paths(list(self.current_files))
+            if not self.grid.currentIndex().isValid():
+                self.grid.select_row(0)
+
+    @traced("grid.action")
+    def on_grid_action(self, handler):
+        # The selection goes to Clutter (or stays) as one undo step, and the
+        # cell after it is selected for the next decision.
+        selected = self.grid.selected_paths()
+        if not selected:
+            return
+        row = min(self.grid_model.row_of(path) for path in selected)
+        handler(self.queued_group(selected))
+        self.grid.select_row(row)
+
     def toggle_fullscreen(self):
         if self.is_fullscreen:
             self.showNormal()
@@ -530,12 +1781,48 @@ class MainWindow(QMainWindow):
         self.is_fullscreen = not self.is_fullscreen
 
     def highlight_label(self, label, color):
-        label.setStyleSheet(f"QLabel {{ font-size: 14px; color: {color}; margin-top: 5px; font-weight: bold; }}")
-        QTimer.singleShot(200, lambda: label.setStyleSheet("QLabel { font-size: 14px; color: #7F8C8D; margin-top: 5px; }"))
+        label.setStyleSheet(LABEL_STYLE.format(font_size=self.label_font_size, color=color, weight="bold"))
+        QTimer.singleShot(200, lambda: label.setStyleSheet(self.label_style()))
+
+    def label_style(self):
+        return LABEL_STYLE.format(font_size=self.label_font_size, color="#7F8C8D", weight="normal")
 
     def eventFilter(self, obj, event):
-        if event.type() == QEvent.KeyPress:
+        # Arrow keys belong to the group menu while it is open, and typing to
+        # the search box while it has focus.
+        if event.type() == QEvent.KeyPress and QApplication.activePopupWidget() is None:
             key_event = QKeyEvent(event)
+            if self.search_box.hasFocus():
+                if key_event.key() in (Qt.Key_Return, Qt.Key_Enter, Qt.Key_Escape):
+                    if key_event.key() == Qt.Key_Escape:
+                        self.search_box.clear()
+                    self.search_timer.stop()
+                    self.apply_search()
+                    self.setFocus()
+                    return True
+                return super().eventFilter(obj, event)
+            if key_event.matches(QKeySequence.Find):
+                self.search_box.setFocus()
+                self.search_box.selectAll()
+                return True
+            if key_event.key() == Qt.Key_Tab:
+                self.toggle_grid()
+                return True
+            if key_event.matches(QKeySequence.Undo):
+                self.on_undo()
+                self.highlight_label(self.undo_label, "#3498DB")
+                return True
+            if self.grid_mode:
+                if key_event.key() in (Qt.Key_Delete, Qt.Key_Backspace):
+                    self.on_discard()
+                    self.highlight_label(self.discard_label, "#FF4040")
+                    return True
+                elif key_event.key() in (Qt.Key_Return, Qt.Key_Enter):
+                    self.on_keep()
+                    self.highlight_label(self.keep_label, "#FFC000")
+                    return True
+                elif key_event.key() in (Qt.Key_Left, Qt.Key_Right, Qt.Key_Up, Qt.Key_Down):
+                    return super().eventFilter(obj, event)
             if key_event.key() == Qt.Key_Left:
                 self.on_discard()
                 self.highlight_label(self.discard_label, "#FF4040")
@@ -548,19 +1835,48 @@ class MainWindow(QMainWindow):
                 self.on_undo()
                 self.highlight_label(self.undo_label, "#3498DB")
                 return True
+            elif key_event.key() == Qt.Key_G:
+                self.group_button.showMenu()
+                return True
+            elif key_event.key() == Qt.Key_Down:
+                self.on_discard_duplicates()
+                self.highlight_label(self.duplicates_label, "#9B59B6")
+                return True
             elif key_event.key() == Qt.Key_F11:
                 self.toggle_fullscreen()
                 return True
+            elif key_event.key() == Qt.Key_F12 and self.debug_overlay is not None:
+                self.debug_overlay.setVisible(not self.debug_overlay.isVisible())
+                return True
         return super().eventFilter(obj, event)
 
+    def closeEvent(self, event):
+        self.indexer.finish()
+        if self.duplicate_finder is not None:
+            self.duplicate_finder.requestInterruption()
+            self.duplicate_finder.wait()
+        self.move_queue.finish()
+        self.journal.close()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.preview_engine.shutdown()
+        self.grid_model.shutdown()
+        self.metadata_store.close()
+        super().closeEvent(event)
+
     def showEvent(self, event):
         super().showEvent(event)
         self.setFocus()  # Ensure the main window has focus to capture key events
+        if self.start_in_grid:
+            self.start_in_grid = False
+            self.toggle_grid()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self.adjust_layout()
+        # A window drag delivers a resize per frame; lay out once it settles.
+        self.layout_timer.start()
 
+    @traced("layout")
     def adjust_layout(self):
         # Adjust button sizes
         button_width = max(int(self.width() * 0.3), 100)  # Minimum width of 100
@@ -572,28 +1888,67 @@ class MainWindow(QMainWindow):
         undo_width = max(int(self.width() * 0.15), 50)  # Minimum width of 50
         undo_height = max(int(self.height() * 0.05), 20)  # Minimum height of 20
         self.undo_button.setFixedSize(undo_width, undo_height)
-
-        # Adjust font sizes
-        base_font_size = max(int(self.width() * 0.015), 8)  # Minimum font size of 8
-        self.discard_button.setStyleSheet(self.discard_button.styleSheet() + f"font-size: {base_font_size}px;")
-        self.keep_button.setStyleSheet(self.keep_button.styleSheet() + f"font-size: {base_font_size}px;")
-        self.undo_button.setStyleSheet(self.undo_button.styleSheet() + f"font-size: {max(int(base_font_size * 0.8), 6)}px;")
-
-        # Adjust label font sizes
-        label_font_size = max(int(base_font_size * 0.7), 6)  # Minimum font size of 6
-        label_style = f"font-size: {label_font_size}px; color: #7F8C8D; margin-top: 5px;"
+        self.duplicates_button.setFixedSize(int(undo_width * 1.6), undo_height)
+        self.group_button.setFixedSize(undo_width, undo_height)
+        self.view_button.setFixedSize(undo_width, undo_height)
+
+        self.apply_font_size(max(int(self.width() * 0.015), 8))  # Minimum font size of 8
+
+        # Hidden cards in the stack pick up their size when they are shown.
+        card = self.stack.currentWidget()
+        if isinstance(card, FileCard):
+            card.adjust_content_size()
+
+    def apply_font_size(self, base_font_size):
+        if base_font_size == self.base_font_size:
+            return
+        self.base_font_size = base_font_size
+        self.label_font_size = max(int(base_font_size * 0.7), 6)  # Minimum font size of 6
+
+        self.discard_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=base_font_size, radius=25, padding="15px 30px",
+            color="#FF4040", hover="#E74C3C", pressed="#C0392B"))
+        self.keep_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=base_font_size, radius=25, padding="15px 30px",
+            color="#FFC000", hover="#F1C40F", pressed="#F39C12"))
+        self.undo_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=max(int(base_font_size * 0.8), 6), radius=15, padding="10px 20px",
+            color="#3498DB", hover="#2980B9", pressed="#2573A7"))
+        self.duplicates_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=max(int(base_font_size * 0.8), 6), radius=15, padding="10px 20px",
+            color="#9B59B6", hover="#8E44AD", pressed="#7D3C98"))
+        self.group_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=max(int(base_font_size * 0.8), 6), radius=15, padding="10px 20px",
+            color="#16A085", hover="#138D75", pressed="#117A65"))
+        self.view_button.setStyleSheet(BUTTON_STYLE.format(
+            font_size=max(int(base_font_size * 0.8), 6), radius=15, padding="10px 20px",
+            color="#34495E", hover="#2C3E50", pressed="#22303D"))
+
+        label_style = self.label_style()
         self.discard_label.setStyleSheet(label_style)
         self.keep_label.setStyleSheet(label_style)
         self.undo_label.setStyleSheet(label_style)
-
-        # Adjust content in the stack
-        for i in range(self.stack.count()):
-            widget = self.stack.widget(i)
-            if isinstance(widget, FileCard):
-                widget.adjust_content_size()
+        self.duplicates_label.setStyleSheet(label_style)
+        self.group_label.setStyleSheet(label_style)
+        self.view_label.setStyleSheet(label_style)
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    # In a frozen (PyInstaller) build, spawned search and hashing workers start
+    # this same executable; this hands them to their worker function instead
+    # of opening another window.
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Swipe through the files on your desktop.")
+    parser.add_argument("--order", choices=sorted(SORT_KEYS), help="order to present files in (default: directory order)")
+    parser.add_argument("--no-watch", action="store_true", help="don't pick up files added or removed while running")
+    parser.add_argument("--clutter", help="folder to move discarded files into (default: Desktop/Desktop Clutter)")
+    parser.add_argument("--preview-memory", type=int, default=PREVIEW_MEMORY_MB, metavar="MB",
+                        help=f"memory for decoded previews kept ahead and for undo (default: {PREVIEW_MEMORY_MB})")
+    parser.add_argument("--recursive", nargs="?", type=int, const=DEFAULT_RECURSIVE_DEPTH, default=0, metavar="DEPTH",
+                        help=f"include files in subfolders, up to DEPTH levels down (default with no DEPTH: {DEFAULT_RECURSIVE_DEPTH})")
+    parser.add_argument("--grid", action="store_true", help="start in the thumbnail grid instead of one card at a time")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
     
     app.setStyle("Fusion")  # Use Fusion style for a modern look
     
@@ -601,7 +1956,8 @@ if __name__ == '__main__':
     font = QFont("Segoe UI", 10)
     app.setFont(font)
     
-    main_window = MainWindow()
+    main_window = MainWindow(args.order, watch=not args.no_watch, clutter_folder=args.clutter, depth=args.recursive,
+                             preview_memory_mb=args.preview_memory, grid=args.grid)
     main_window.setMinimumSize(600, 400)  # Set a minimum window size
     main_window.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+
+from groupcommit import GroupCommit
+from userdirs import cache_dir
+
+# What previews and the search index extracted from each file, kept across
+# sessions in SQLite (WAL mode) so PDFs and DOCX files aren't reopened every
+# launch. Rows are keyed by (device, inode, size, mtime_ns): a file that
+# changes gets a new key and simply misses.
+#
+# The whole table is read into memory in one query when the background
+# thread starts; lookups are dictionary hits from then on. Writes are
+# collected and committed by the same thread, WRITE_BATCH_SECONDS at a time.
+
+STORE_NAME = "metadata.sqlite3"
+WRITE_BATCH_SECONDS = 1.0
+LOAD_TIMEOUT_SECONDS = 10.0  # lookups give up on a slow load and count as misses
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    preview TEXT,
+    tokens TEXT,
+    PRIMARY KEY (device, inode, size, mtime_ns)
+) WITHOUT ROWID
+"""
+
+
+def file_key(stat):
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class MetadataStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), STORE_NAME)
+        self.rows = {}  # key -> [path, preview, tokens]
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.commits = GroupCommit(WRITE_BATCH_SECONDS)  # key + row tuples
+        self.thread = None
+
+    def open(self):
+        self.thread = threading.Thread(target=self.run, name="metastore", daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(SCHEMA)
+        return connection
+
+    def load(self, connection):
+        # One query for everything. Lookups can start as soon as it is in;
+        # rows whose file has changed, moved or gone are then found with a
+        # stat each and deleted, as they would never be hit again.
+        # Columns by name: stores from before the kind column was dropped
+        # still have it.
+        rows = {}
+        for device, inode, size, mtime_ns, path, preview, tokens in connection.execute(
+                "SELECT device, inode, size, mtime_ns, path, preview, tokens FROM files"):
+            rows[(device, inode, size, mtime_ns)] = [path, preview, tokens]
+        with self.lock:
+            rows.update(self.rows)  # anything put before loading finished
+            self.rows = rows
+        self.loaded.set()
+
+        stale = []
+        for key, row in list(rows.items()):
+            try:
+                current = file_key(os.stat(row[0]))
+            except OSError:
+                current = None
+            if current != key:
+                stale.append(key)
+        if stale:
+            with self.lock:
+                for key in stale:
+                    self.rows.pop(key, None)
+            with connection:
+                connection.executemany(
+                    "DELETE FROM files WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?", stale)
+
+    def run(self):
+        # Whatever happens, lookups must not wait on loaded forever.
+        try:
+            try:
+                connection = self.connect()
+                self.load(connection)
+            finally:
+                self.loaded.set()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error opening metadata store: {e}")
+            self.commits.close(discard=True)
+            return
+        for batch in self.commits.batches():
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO files (device, inode, size, mtime_ns, path, preview, tokens) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            except sqlite3.Error as e:
+                print(f"Error writing metadata store: {e}")
+        connection.close()
+
+    def get(self, key):
+        # Waits for the initial load, so only call this off the GUI thread.
+        if not self.loaded.wait(LOAD_TIMEOUT_SECONDS):
+            return None
+        with self.lock:
+            return self.rows.get(key)
+
+    def update(self, key, path, column, value):
+        with self.lock:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = [path, None, None]
+            row[0] = path
+            row[column] = value
+            row = key + tuple(row)
+        # Later rows for the same key replace earlier ones in the batch.
+        self.commits.add(row)
+
+    def get_preview(self, key):
+        # A (kind, payload) preview result, or None.
+        row = self.get(key)
+        if row is None or row[1] is None:
+            return None
+        kind, payload = json.loads(row[1])
+        return (kind, payload)
+
+    def put_preview(self, key, path, result):
+        self.update(key, path, 1, json.dumps(result, ensure_ascii=False))
+
+    def get_tokens(self, key):
+        row = self.get(key)
+        if row is None or row[2] is None:
+            return None
+        return row[2].split()
+
+    def put_tokens(self, key, path, tokens):
+        self.update(key, path, 2, " ".join(tokens))
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.commits.close()
+        self.thread.join()
+        self.thread = None
@@ -0,0 +1,82 @@
+import os
+import shutil
+
+COPY_CHUNK = 8 * 1024 * 1024
+
+
+def same_device(src, dst):
+    try:
+        return os.stat(src).st_dev == os.stat(os.path.dirname(dst) or ".").st_dev
+    except OSError:
+        return False
+
+
+def copy_range(src_fd, dst_fd, total, progress):
+    # Kernel-side copies where the platform has them: copy_file_range (Linux,
+    # can reflink or do server-side copies), then sendfile, then plain reads.
+    done = 0
+    for name in ("copy_file_range", "sendfile"):
+        call = getattr(os, name, None)
+        if call is None:
+            continue
+        try:
+            while done < total:
+                if name == "copy_file_range":
+                    sent = call(src_fd, dst_fd, min(COPY_CHUNK, total - done))
+                else:
+                    sent = call(dst_fd, src_fd, done, min(COPY_CHUNK, total - done))
+                if sent == 0:
+                    break
+                done += sent
+                if progress is not None:
+                    progress(done, total)
+            return done
+        except OSError:
+            # Not supported for this pair of files (EXDEV on older kernels,
+            # EINVAL/ENOSYS, or macOS sendfile needing a socket); resume from
+            # where it stopped with the next method.
+            os.lseek(src_fd, done, os.SEEK_SET)
+            os.lseek(dst_fd, done, os.SEEK_SET)
+
+    while True:
+        chunk = os.read(src_fd, COPY_CHUNK)
+        if not chunk:
+            return done
+        view = memoryview(chunk)
+        while view:
+            written = os.write(dst_fd, view)
+            view = view[written:]
+        done += len(chunk)
+        if progress is not None:
+            progress(done, total)
+
+
+def move_file(src, dst, progress=None):
+    # A rename when src and dst share a filesystem, otherwise a copy (with
+    # progress(done, total) callbacks), metadata copy and unlink of the
+    # source. A failed copy removes the partial destination, and so does a
+    # source that changed while it was copied (a download still being
+    # written), which is left where it is.
+    if same_device(src, dst):
+        os.rename(src, dst)
+        return
+
+    binary = getattr(os, "O_BINARY", 0)
+    src_fd = os.open(src, os.O_RDONLY | binary)
+    try:
+        before = os.fstat(src_fd)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary, 0o666)
+        try:
+            done = copy_range(src_fd, dst_fd, before.st_size, progress)
+            after = os.fstat(src_fd)
+            if done != before.st_size or (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+                raise OSError(f"{os.path.basename(src)} changed while it was being moved")
+        except BaseException:
+            os.close(dst_fd)
+            os.remove(dst)
+            raise
+        os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    shutil.copystat(src, dst)
+    os.remove(src)
@@ -0,0 +1,362 @@
+import codecs
+import csv
+import mmap
+import os
+import struct
+import tarfile
+import time
+import zipfile
+
+from scanner import format_size
+
+# Nothing in here touches Qt, so these run safely on preview worker threads.
+# PyMuPDF, python-docx and lxml are imported inside the functions that need
+# them: together they add a noticeable chunk to startup, and many sessions
+# never see a PDF or DOCX at all.
+
+PREVIEW_CHARS = 1000
+PDF_TIME_BUDGET = 0.5  # seconds of text extraction per document
+PDF_TEXT_PAGES = 20  # pages to look through for text before rendering page 1
+PDF_RENDER_SIZE = 300  # long side, in pixels, of the page 1 fallback render
+TEXT_HEAD_BYTES = 8 * 1024  # read from the start of text files, whatever their size
+CSV_ROWS = 20
+CSV_COLUMNS = 12
+CSV_CELL_CHARS = 40
+ARCHIVE_NAMES = 30  # entry names listed in an archive preview
+ARCHIVE_TIME_BUDGET = 0.5  # seconds of tar header reading per archive
+ZIP_EXTENSIONS = (".zip", ".jar", ".apk", ".epub", ".whl", ".xlsx", ".pptx", ".odt", ".ods", ".odp")
+TAR_EXTENSIONS = (".tar", ".tgz", ".tbz2", ".txz", ".gz", ".bz2", ".xz")
+# Zip end of central directory records and central directory headers
+# (APPNOTE.TXT 4.3.12 - 4.3.16).
+ZIP_END = struct.Struct("<4s4H2LH")
+ZIP_END_SIGNATURE = b"PK\x05\x06"
+ZIP_END_SEARCH = ZIP_END.size + 0xFFFF  # the record is followed by a comment of up to 64 KB
+ZIP64_LOCATOR = struct.Struct("<4sLQL")
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_END = struct.Struct("<4sQ2H2L4Q")
+ZIP64_END_SIGNATURE = b"PK\x06\x06"
+# Only signature, flags, uncompressed size and the three lengths are unpacked.
+ZIP_ENTRY = struct.Struct("<4s4xH14xL3H12x")
+ZIP_ENTRY_SIGNATURE = b"PK\x01\x02"
+ZIP_UTF8_FLAG = 0x800
+ZIP64_EXTRA_ID = 1
+BINARY_CONTROL_RATIO = 0.1  # control characters above this fraction mean binary
+FALLBACK_ENCODING = "cp1252"
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Everything but the control characters that don't turn up in text, for
+# counting those with one bytes.translate call.
+NOT_BINARY_BYTES = bytes(byte for byte in range(256) if byte >= 32 or byte in b"\t\n\r\f\b\x1b")
+
+W_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P = W_NAMESPACE + "p"
+W_T = W_NAMESPACE + "t"
+W_TAB = W_NAMESPACE + "tab"
+W_BR = W_NAMESPACE + "br"
+W_CR = W_NAMESPACE + "cr"
+DOCX_TEXT_TAGS = (W_P, W_T, W_TAB, W_BR, W_CR)
+
+
+def truncate_preview(text, limit=PREVIEW_CHARS):
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def extract_pdf_preview(file_path, limit=PREVIEW_CHARS, time_budget=PDF_TIME_BUDGET):
+    # Returns ("text", str), or ("png", bytes) with a small render of page 1
+    # when there is no text layer (scans). Pages are loaded one at a time and
+    # extraction stops at the character budget, after PDF_TEXT_PAGES pages or
+    # once time_budget seconds have passed, whichever comes first.
+    import fitz  # PyMuPDF for PDF preview
+
+    deadline = time.monotonic() + time_budget
+    with fitz.open(file_path) as doc:
+        if doc.needs_pass:
+            return ("text", "Encrypted PDF")
+        if doc.page_count == 0:
+            return ("text", "")
+
+        first = doc.load_page(0)
+        rect = first.rect
+        # The top of page 1 usually holds enough text on its own, and a clipped
+        # extraction skips laying out everything below it.
+        split = rect.y0 + rect.height / 3
+        parts = [first.get_text(clip=fitz.Rect(rect.x0, rect.y0, rect.x1, split))]
+        length = len(parts[0])
+        if length <= limit:
+            parts.append(first.get_text(clip=fitz.Rect(rect.x0, split, rect.x1, rect.y1)))
+            length += len(parts[-1])
+
+        page_number = 1
+        while length <= limit and page_number < min(doc.page_count, PDF_TEXT_PAGES):
+            if time.monotonic() > deadline:
+                break
+            parts.append(doc.load_page(page_number).get_text())
+            length += len(parts[-1])
+            page_number += 1
+
+        text = "".join(parts)
+        if text.strip():
+            return ("text", truncate_preview(text, limit))
+
+        zoom = PDF_RENDER_SIZE / max(rect.width, rect.height, 1)
+        pixmap = first.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return ("png", pixmap.tobytes("png"))
+
+
+def stream_docx_text(file_path, limit=PREVIEW_CHARS):
+    # Pulls text out of word/document.xml with iterparse and stops as soon as
+    # the budget is met, so the rest of the XML (and any embedded media) is
+    # never read. Unlike doc.paragraphs this also picks up table text.
+    from lxml import etree
+
+    paragraphs = []
+    current = []
+    length = 0
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("word/document.xml") as xml:
+            events = etree.iterparse(xml, events=("end",), tag=DOCX_TEXT_TAGS)
+            for _, element in events:
+                tag = element.tag
+                if tag == W_T:
+                    text = element.text or ""
+                    current.append(text)
+                    length += len(text)
+                elif tag == W_TAB:
+                    current.append("\t")
+                    length += 1
+                elif tag == W_BR or tag == W_CR:
+                    current.append("\n")
+                    length += 1
+                elif tag == W_P:
+                    paragraphs.append("".join(current))
+                    current = []
+                    length += 1
+                    # Drop finished paragraphs so memory stays flat.
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                if length > limit:
+                    break
+    if current:
+        paragraphs.append("".join(current))
+    return truncate_preview("\n".join(paragraphs), limit)
+
+
+def extract_docx_text(file_path, limit=PREVIEW_CHARS):
+    from lxml import etree
+
+    try:
+        return stream_docx_text(file_path, limit)
+    except (zipfile.BadZipFile, KeyError, etree.LxmlError):
+        # Odd producers (e.g. a main part not at word/document.xml) still open
+        # through python-docx, which follows the package relationships.
+        from docx import Document  # python-docx for DOCX preview
+
+        doc = Document(file_path)
+        text = "\n".join([para.text for para in doc.paragraphs])
+        return truncate_preview(text, limit)
+
+
+def read_head(file_path, limit=TEXT_HEAD_BYTES):
+    # Maps the file and copies out only its first limit bytes, so the page
+    # cache brings in a few pages however large the file is. Returns
+    # (head bytes, whether the file goes on past them).
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return b"", False
+        length = min(size, limit)
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:length], size > length
+
+
+def decode_head(head, truncated):
+    # Returns the decoded text, or None for binary data. A BOM decides the
+    # encoding; otherwise UTF-8 if it decodes (allowing a character cut off
+    # at the end of the head), else FALLBACK_ENCODING.
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            decoder = codecs.getincrementaldecoder(encoding)("replace")
+            return decoder.decode(head, final=not truncated)
+
+    if b"\0" in head:
+        return None
+    if len(head.translate(None, NOT_BINARY_BYTES)) > BINARY_CONTROL_RATIO * len(head):
+        return None
+    try:
+        return codecs.getincrementaldecoder("utf-8")().decode(head, final=not truncated)
+    except UnicodeDecodeError:
+        return head.decode(FALLBACK_ENCODING, "replace")
+
+
+def extract_text_preview(file_path, limit=PREVIEW_CHARS):
+    # ("text", str) for text files, ("table", rows) for CSV/TSV, or
+    # ("message", str) for binary content.
+    head, truncated = read_head(file_path)
+    text = decode_head(head, truncated)
+    if text is None:
+        return ("message", "Binary file, no preview")
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in (".csv", ".tsv"):
+        rows = csv_rows(text, truncated, "\t" if extension == ".tsv" else None)
+        if rows:
+            return ("table", rows)
+    if truncated:
+        text += "..."
+    return ("text", truncate_preview(text, limit))
+
+
+def csv_rows(text, truncated, delimiter=None):
+    # The first CSV_ROWS rows, with long rows and cells clipped. The last line
+    # of a truncated head is incomplete, so it is dropped.
+    lines = text.splitlines()
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]
+    lines = lines[:CSV_ROWS]
+    if delimiter is None:
+        try:
+            delimiter = csv.Sniffer().sniff("\n".join(lines), ",;\t|").delimiter
+        except csv.Error:
+            delimiter = ","
+    try:
+        rows = list(csv.reader(lines, delimiter=delimiter))
+    except csv.Error:
+        return None
+    return [
+        [cell if len(cell) <= CSV_CELL_CHARS else cell[:CSV_CELL_CHARS] + "..." for cell in row[:CSV_COLUMNS]]
+        for row in rows
+    ]
+
+
+def extract_archive_preview(file_path, names=ARCHIVE_NAMES):
+    # ("text", summary) with the file count, total uncompressed size and the
+    # first names, or ("message", str) if the file isn't an archive we can
+    # read. Nothing is decompressed for zips, see zip_summary. Tar headers are
+    # read one at a time, seeking past member data, for at most
+    # ARCHIVE_TIME_BUDGET seconds; a compressed tar has to be inflated up to
+    # each header, so big ones get a partial count.
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension in ZIP_EXTENSIONS:
+            return ("text", zip_summary(file_path, names))
+        return ("text", tar_summary(file_path, names))
+    except (ValueError, struct.error, tarfile.TarError, EOFError):
+        return ("message", "No preview available")
+
+
+def zip_summary(file_path, names):
+    # Reads the end of central directory record from the tail of the file,
+    # then the central directory in one read, and walks its fixed-size
+    # headers. Names past the first few are skipped without decoding.
+    with open(file_path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        tail_start = max(size - ZIP_END_SEARCH, 0)
+        f.seek(tail_start)
+        tail = f.read()
+        end = tail.rfind(ZIP_END_SIGNATURE)
+        if end < 0 or len(tail) - end < ZIP_END.size:
+            raise ValueError("not a zip file")
+        _, _, _, _, count, directory_size, directory_offset, _ = ZIP_END.unpack_from(tail, end)
+        directory_end = tail_start + end
+        if count == 0xFFFF or directory_size == 0xFFFFFFFF or directory_offset == 0xFFFFFFFF:
+            locator = end - ZIP64_LOCATOR.size
+            if ZIP64_LOCATOR.unpack_from(tail, locator)[0] != ZIP64_LOCATOR_SIGNATURE:
+                raise ValueError("bad zip64 locator")
+            # Like zipfile, expect the zip64 record right before its locator.
+            directory_end = tail_start + locator - ZIP64_END.size
+            f.seek(directory_end)
+            record = ZIP64_END.unpack(f.read(ZIP64_END.size))
+            if record[0] != ZIP64_END_SIGNATURE:
+                raise ValueError("bad zip64 end record")
+            directory_size = record[8]
+        # The directory ends where the end records start. Going by that rather
+        # than the stored offset also covers self-extracting and other
+        # prefixed zips, whose offsets are relative to the start of the zip.
+        if directory_size > directory_end:
+            raise ValueError("bad central directory size")
+        f.seek(directory_end - directory_size)
+        directory = f.read(directory_size)
+
+    files = 0
+    total = 0
+    listed = []
+    position = 0
+    header_size = ZIP_ENTRY.size
+    unpack = ZIP_ENTRY.unpack_from
+    end = len(directory) - header_size
+    while position <= end:
+        signature, flags, uncompressed, name_length, extra_length, comment_length = unpack(directory, position)
+        if signature != ZIP_ENTRY_SIGNATURE:
+            raise ValueError("bad central directory header")
+        name_start = position + header_size
+        name_end = name_start + name_length
+        position = name_end + extra_length + comment_length
+        if name_length and directory[name_end - 1] == 0x2F:  # directories end in "/"
+            continue
+        if uncompressed == 0xFFFFFFFF:
+            uncompressed = zip64_size(directory[name_end:name_end + extra_length])
+        files += 1
+        total += uncompressed
+        if len(listed) < names:
+            listed.append(directory[name_start:name_end].decode("utf-8" if flags & ZIP_UTF8_FLAG else "cp437", "replace"))
+    return archive_summary(files, total, listed, True)
+
+
+def zip64_size(extra):
+    # The uncompressed size is the first field of the zip64 extra block.
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<2H", extra, position)
+        if header_id == ZIP64_EXTRA_ID:
+            return struct.unpack_from("<Q", extra, position + 4)[0]
+        position += 4 + length
+    raise ValueError("missing zip64 size")
+
+
+def tar_summary(file_path, names):
+    deadline = time.monotonic() + ARCHIVE_TIME_BUDGET
+    count = 0
+    total = 0
+    listed = []
+    complete = True
+    with tarfile.open(file_path, "r:*") as archive:
+        while True:
+            member = archive.next()
+            if member is None:
+                break
+            # TarFile keeps every member it has read; only the headers matter here.
+            archive.members = []
+            if not member.isfile():
+                continue
+            count += 1
+            total += member.size
+            if len(listed) < names:
+                listed.append(member.name)
+            if time.monotonic() > deadline:
+                complete = False
+                break
+    return archive_summary(count, total, listed, complete)
+
+
+def archive_summary(count, total, listed, complete):
+    files = "file" if count == 1 else "files"
+    if complete:
+        header = f"{count:,} {files}, {format_size(total)} uncompressed"
+    else:
+        header = f"At least {count:,} {files}, {format_size(total)}+ uncompressed"
+    lines = [header, ""] + listed
+    if count > len(listed):
+        lines.append(f"... and {count - len(listed):,} more" if complete else "...")
+    return "\n".join(lines)
+
+
+def warm_backends():
+    # Meant for a background thread right after startup, so the first PDF or
+    # DOCX preview doesn't pay for the imports.
+    import fitz
+    import lxml.etree
@@ -0,0 +1,139 @@
+import os
+import queue
+
+BATCH_SIZE = 256
+FIRST_BATCH_SIZE = 8
+WALK_WORKERS = 4
+
+
+class FileEntry:
+    __slots__ = ("path", "name", "size", "mtime_ns")
+
+    def __init__(self, path, name, size, mtime_ns):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def from_path(cls, path):
+        stat = os.stat(path)
+        return cls(path, os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+
+def format_size(size):
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    elif size < 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / (1024 * 1024 * 1024):.1f} GB"
+
+
+SORT_KEYS = {
+    "name": lambda entry: entry.name.lower(),
+    "largest": lambda entry: -entry.size,
+    "smallest": lambda entry: entry.size,
+    "oldest": lambda entry: entry.mtime_ns,
+    "newest": lambda entry: -entry.mtime_ns,
+}
+
+
+def iter_directory(directory):
+    # One scandir pass; is_file() comes from the directory listing itself and
+    # stat() is cached on the DirEntry (free on Windows, a single call
+    # elsewhere), so every file is statted at most once.
+    try:
+        it = os.scandir(directory)
+    except OSError as e:
+        print(f"Error scanning {directory}: {e}")
+        return
+    with it:
+        for entry in it:
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield FileEntry(entry.path, entry.name, stat.st_size, stat.st_mtime_ns)
+
+
+def scan_level(path, descend, excluded):
+    # One directory of a tree walk: its files, plus the subdirectories to walk
+    # next if descend is set. Hidden folders, symlinked folders and anything in
+    # excluded are never entered.
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if descend and not entry.name.startswith(".") and os.path.normcase(entry.path) not in excluded:
+                            subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append(FileEntry(entry.path, entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def iter_tree(directory, max_depth, exclude=(), workers=WALK_WORKERS):
+    # Like iter_directory, but also walks subfolders up to max_depth levels
+    # down (0 is the top level only). Directories are listed concurrently on a
+    # bounded pool, and each one's files are yielded as soon as it has been
+    # read, so deep trees stream out instead of arriving all at the end.
+    from concurrent.futures import ThreadPoolExecutor
+
+    excluded = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+    results = queue.Queue()
+
+    def scan(path, depth):
+        try:
+            files, subdirs = scan_level(path, depth < max_depth, excluded)
+        except Exception as e:
+            print(f"Error scanning {path}: {e}")
+            files, subdirs = [], []
+        results.put((files, subdirs, depth))
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="walk") as pool:
+        pool.submit(scan, os.path.abspath(directory), 0)
+        pending = 1
+        while pending:
+            files, subdirs, depth = results.get()
+            pending -= 1
+            for subdir in subdirs:
+                pool.submit(scan, subdir, depth + 1)
+                pending += 1
+            yield from files
+
+
+def iter_batches(directory, order=None, batch_size=BATCH_SIZE, depth=0, exclude=()):
+    # Unordered scans stream out as they are read; ordered ones have to see
+    # every entry first, but sort on the stat data already collected. Batches
+    # start small and double up to batch_size, so the first card can show
+    # before a big directory has been read. depth > 0 includes subfolders.
+    if depth > 0:
+        entries = iter_tree(directory, depth, exclude)
+    else:
+        entries = iter_directory(directory)
+    if order is not None:
+        entries = iter(sorted(entries, key=SORT_KEYS[order]))
+
+    batch = []
+    limit = min(FIRST_BATCH_SIZE, batch_size)
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= limit:
+            yield batch
+            batch = []
+            limit = min(limit * 2, batch_size)
+    if batch:
+        yield batch
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    # Everything the app keeps under ~ (desktop, journal, caches) lands here.
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for name in ("XDG_CACHE_HOME", "XDG_DATA_HOME"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def slot_errors(monkeypatch):
+    # PyQt aborts on an exception in a slot unless sys.excepthook is replaced;
+    # collect them instead so a test can fail on them.
+    errors = []
+    monkeypatch.setattr(sys, "excepthook", lambda kind, value, tb: errors.append(value))
+    return errors
+
+
+@pytest.fixture
+def pump(qapp):
+    def pump(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            qapp.processEvents()
+    return pump
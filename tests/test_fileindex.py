@@ -0,0 +1,28 @@
+from fileindex import FileIndex, FileQueue
+from scanner import FileEntry
+
+
+def make_index(names):
+    entries = FileIndex()
+    for name in names:
+        entries["/d/" + name] = FileEntry("/d/" + name, name, 1, 0)
+    return entries
+
+
+def test_queue_takes_out_a_group_in_place():
+    entries = make_index(["a.dmg", "b.txt", "c.dmg", "d.txt", "e.zip"])
+    queue = FileQueue(entries, entries)
+    group = queue.index.select(extensions=[".dmg"])
+    assert group == {"/d/a.dmg", "/d/c.dmg"}
+
+    for path in group:
+        queue.discard(path)
+    assert list(queue) == ["/d/b.txt", "/d/d.txt", "/d/e.zip"]
+    assert queue[0] == "/d/b.txt" and "/d/a.dmg" not in queue
+    assert queue.index.select(extensions=[".dmg"]) == set()
+
+    queue.appendleft("/d/c.dmg")
+    queue.append("/d/b.txt")
+    assert list(queue) == ["/d/c.dmg", "/d/d.txt", "/d/e.zip", "/d/b.txt"]
+    assert [queue.popleft() for _ in range(len(queue))] == ["/d/c.dmg", "/d/d.txt", "/d/e.zip", "/d/b.txt"]
+    assert not queue
@@ -0,0 +1,23 @@
+from journal import Journal
+
+
+def test_torn_final_line_is_dropped(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    path.write_text(
+        '{"op": "keep", "path": "/a", "size": 1, "mtime_ns": 2}\n'
+        '{"op": "keep", "path": "/b", "si'
+    )
+
+    journal = Journal(str(path))
+    journal.open()
+    assert journal.is_kept("/a", 1, 2)
+    assert not journal.is_kept("/b", 1, 2)
+    journal.record_keep("/c", 3, 4)
+    journal.close()
+
+    journal = Journal(str(path))
+    journal.open()
+    assert journal.is_kept("/a", 1, 2)
+    assert journal.is_kept("/c", 3, 4)
+    assert [record["path"] for record in journal.history] == ["/a", "/c"]
+    journal.close()
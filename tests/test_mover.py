@@ -0,0 +1,30 @@
+import pytest
+
+import mover
+
+
+def test_move_keeps_a_source_that_grows_during_the_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(mover, "same_device", lambda src, dst: False)
+    src = tmp_path / "download.bin"
+    dst = tmp_path / "moved.bin"
+    src.write_bytes(b"x" * 1000)
+
+    def grow(done, total):
+        with open(src, "ab") as f:
+            f.write(b"y" * 1000)
+
+    with pytest.raises(OSError):
+        mover.move_file(str(src), str(dst), grow)
+    assert src.stat().st_size == 2000
+    assert not dst.exists()
+
+
+def test_move_copies_across_devices(tmp_path, monkeypatch):
+    monkeypatch.setattr(mover, "same_device", lambda src, dst: False)
+    src = tmp_path / "a.bin"
+    dst = tmp_path / "b.bin"
+    src.write_bytes(b"x" * 3000)
+
+    mover.move_file(str(src), str(dst))
+    assert not src.exists()
+    assert dst.read_bytes() == b"x" * 3000
@@ -0,0 +1,37 @@
+import os
+
+import main
+
+
+def names(paths):
+    return [os.path.basename(path) for path in paths]
+
+
+def test_discard_duplicates_during_search(home, qapp, slot_errors, pump):
+    desktop = home / "Desktop"
+    desktop.mkdir()
+    for name in ("report.txt", "copy a.txt", "copy b.txt"):
+        (desktop / name).write_text("the same quarterly numbers")
+    (desktop / "notes.txt").write_text("something else")
+
+    window = main.MainWindow("name", watch=False)
+    window.show()
+    try:
+        pump(2)
+        assert len(window.duplicates) == 3
+
+        window.search_box.setText("report")
+        pump(0.5)
+        assert names(window.current_files) == ["report.txt"]
+        assert window.duplicates_container.isVisibleTo(window)
+
+        window.on_discard_duplicates()
+        pump(0.5)
+        assert sorted(os.listdir(desktop / "Desktop Clutter")) == ["copy a.txt", "copy b.txt"]
+
+        window.search_box.setText("")
+        pump(0.5)
+        assert names(window.current_files) == ["notes.txt", "report.txt"]
+        assert slot_errors == []
+    finally:
+        window.close()
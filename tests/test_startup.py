@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("watch", [True, False])
+def test_startup_creates_missing_desktop(home, qapp, slot_errors, pump, watch):
+    window = main.MainWindow("name", watch=watch)
+    window.show()
+    try:
+        pump(1)
+        assert slot_errors == []
+        assert os.path.isdir(os.path.join(home, "Desktop"))
+        assert list(window.current_files) == []
+
+        open(os.path.join(home, "Desktop", "new.txt"), "w").close()
+        if watch:
+            pump(1)
+            assert [os.path.basename(path) for path in window.current_files] == ["new.txt"]
+    finally:
+        window.close()
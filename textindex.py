@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+from bisect import bisect_left
+
+from previews import read_head, decode_head, stream_docx_text
+
+# Inverted index over file names and document text for the search box.
+# Extraction (index_file) runs in worker processes; SearchIndex itself is
+# updated by one thread and queried from another under its lock.
+
+INDEX_TEXT_CHARS = 200 * 1000  # per document
+INDEX_TEXT_BYTES = 256 * 1024  # head of plain text files
+PDF_INDEX_PAGES = 50
+MIN_PREFIX = 3  # shorter query terms only match whole words
+CONTENT_EXTENSIONS = (
+    ".pdf", ".docx",
+    ".txt", ".md", ".rst", ".log", ".csv", ".tsv", ".json", ".xml", ".yaml", ".yml", ".toml", ".ini", ".cfg",
+    ".py", ".js", ".ts", ".html", ".css", ".sh", ".bat", ".ps1", ".c", ".h", ".cpp", ".java", ".go", ".rs", ".rb", ".sql",
+)
+
+WORD = re.compile(r"[^\W_]{2,}")
+
+
+def tokenize(text):
+    return set(WORD.findall(text.lower()))
+
+
+def extract_text(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".pdf":
+        import fitz
+
+        parts = []
+        length = 0
+        with fitz.open(file_path) as doc:
+            if doc.needs_pass:
+                return ""
+            for page_number in range(min(doc.page_count, PDF_INDEX_PAGES)):
+                parts.append(doc.load_page(page_number).get_text())
+                length += len(parts[-1])
+                if length > INDEX_TEXT_CHARS:
+                    break
+        return "".join(parts)
+    if extension == ".docx":
+        return stream_docx_text(file_path, INDEX_TEXT_CHARS)
+    head, truncated = read_head(file_path, INDEX_TEXT_BYTES)
+    return decode_head(head, truncated) or ""
+
+
+def index_file(file_path):
+    # Worker process entry point: (path, sorted tokens of its contents).
+    # Unreadable files just contribute nothing.
+    try:
+        return file_path, sorted(tokenize(extract_text(file_path)))
+    except Exception:
+        return file_path, []
+
+
+class SearchIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = {}  # token -> set of paths
+        self.documents = {}  # path -> frozenset of its tokens
+        self.vocabulary = []  # every token; sorted again lazily for prefix lookups
+        self.vocabulary_sorted = True
+
+    def add(self, file_path, tokens):
+        # Replaces whatever was indexed for file_path before.
+        tokens = frozenset(tokens)
+        with self.lock:
+            old = self.documents.get(file_path, frozenset())
+            for token in old - tokens:
+                self.postings[token].discard(file_path)
+            for token in tokens - old:
+                paths = self.postings.get(token)
+                if paths is None:
+                    paths = self.postings[token] = set()
+                    self.vocabulary.append(token)
+                    self.vocabulary_sorted = False
+                paths.add(file_path)
+            self.documents[file_path] = tokens
+
+    def extend(self, file_path, tokens):
+        with self.lock:
+            old = self.documents.get(file_path, frozenset())
+        self.add(file_path, old | frozenset(tokens))
+
+    def search(self, query):
+        # Paths matching every term of query. Terms of MIN_PREFIX or more
+        # characters also match longer words ("invoice" finds "invoices").
+        terms = tokenize(query)
+        if not terms:
+            return None
+        with self.lock:
+            self.sort_vocabulary()
+            result = None
+            for term in sorted(terms, key=len, reverse=True):
+                matches = self.term_matches(term)
+                result = matches if result is None else result & matches
+                if not result:
+                    return set()
+            return result
+
+    def sort_vocabulary(self):
+        # The indexer calls this after each chunk so queries rarely have to.
+        # The list is mostly sorted already, which Timsort handles in about
+        # one pass.
+        if not self.vocabulary_sorted:
+            self.vocabulary.sort()
+            self.vocabulary_sorted = True
+
+    def term_matches(self, term):
+        if len(term) < MIN_PREFIX:
+            return set(self.postings.get(term, ()))
+        matches = set()
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            matches |= self.postings[vocabulary[position]]
+            position += 1
+        return matches
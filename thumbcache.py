@@ -0,0 +1,114 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from userdirs import cache_dir
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class ThumbnailCache:
+    # Encoded preview images on disk, keyed by (path, size, mtime_ns, variant).
+    # A changed file gets a new key, so stale entries are never served; they
+    # just age out through LRU eviction. Entry file mtimes record last use, so
+    # the LRU order survives restarts. Safe to share between worker threads.
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory or os.path.join(cache_dir(), "thumbnails")
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = None  # entry name -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.disabled = False  # set if the directory can't be used; every get misses
+
+    def entry_name(self, file_path, size, mtime_ns, variant):
+        key = f"{os.path.abspath(file_path)}\0{size}\0{mtime_ns}\0{variant}"
+        return hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def ensure_index(self):
+        # Deferred to first use so constructing the cache costs nothing on the
+        # GUI thread. Call with the lock held; False if the cache is unusable.
+        if self.entries is None:
+            try:
+                self.load_index()
+            except OSError as e:
+                print(f"Thumbnail cache disabled: {e}")
+                self.entries = OrderedDict()
+                self.disabled = True
+        return not self.disabled
+
+    def load_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        found.sort()
+        self.entries = OrderedDict((name, size) for _, name, size in found)
+        self.total_bytes = sum(self.entries.values())
+
+    def get(self, file_path, size, mtime_ns, variant="preview"):
+        name = self.entry_name(file_path, size, mtime_ns, variant)
+        with self.lock:
+            if not self.ensure_index() or name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.forget(name)
+            return None
+        return data
+
+    def put(self, file_path, size, mtime_ns, data, variant="preview"):
+        if len(data) > self.max_bytes:
+            return
+        name = self.entry_name(file_path, size, mtime_ns, variant)
+        with self.lock:
+            if not self.ensure_index():
+                return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self.lock:
+            self.forget(name)
+            self.entries[name] = len(data)
+            self.total_bytes += len(data)
+            self.evict()
+
+    def forget(self, name):
+        size = self.entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
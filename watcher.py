@@ -0,0 +1,129 @@
+import ctypes
+import ctypes.util
+import os
+import stat
+import struct
+import sys
+
+from PyQt5.QtCore import QObject, QTimer, QSocketNotifier, QFileSystemWatcher, pyqtSignal
+
+from scanner import FileEntry
+
+COALESCE_MS = 300
+PARTIAL_SUFFIXES = (".part", ".crdownload", ".download", ".partial", ".tmp")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_partial_download(name):
+    return name.lower().endswith(PARTIAL_SUFFIXES) or name.startswith("~$")
+
+
+def open_inotify(directory):
+    # Returns an inotify fd watching directory, or None where inotify isn't
+    # available (macOS, Windows, or a libc without it).
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+    except (OSError, AttributeError):
+        return None
+    return fd
+
+
+class DesktopWatcher(QObject):
+    # Reports the net effect of a burst of changes in one directory once it has
+    # been quiet for COALESCE_MS, so a download written as "x.part" and then
+    # renamed to "x" only ever shows up as "x" being added. Only the names that
+    # were touched are looked at again; the directory is never rescanned.
+    files_changed = pyqtSignal(list, list)  # added/updated FileEntry list, removed paths
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.pending = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(COALESCE_MS)
+        self.timer.timeout.connect(self.flush)
+
+        self.inotify_fd = open_inotify(directory)
+        if self.inotify_fd is not None:
+            self.notifier = QSocketNotifier(self.inotify_fd, QSocketNotifier.Read, self)
+            self.notifier.activated.connect(self.read_inotify)
+        else:
+            # QFileSystemWatcher only says "something changed", so diff the
+            # names against the last listing (no per-file stat) to find out what.
+            try:
+                self.known_names = set(os.listdir(directory))
+            except OSError:
+                self.known_names = set()
+            self.fs_watcher = QFileSystemWatcher([directory], self)
+            self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+
+    def read_inotify(self):
+        try:
+            data = os.read(self.inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # The kernel dropped events; recheck whatever is there now.
+                self.pending.update(os.listdir(self.directory))
+            elif name:
+                self.pending.add(os.fsdecode(name))
+        self.timer.start()
+
+    def on_directory_changed(self, path):
+        try:
+            names = set(os.listdir(self.directory))
+        except OSError:
+            return
+        self.pending.update(names ^ self.known_names)
+        self.known_names = names
+        self.timer.start()
+
+    def flush(self):
+        added = []
+        removed = []
+        for name in self.pending:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                removed.append(path)
+                continue
+            if stat.S_ISREG(st.st_mode) and not is_partial_download(name):
+                added.append(FileEntry(path, name, st.st_size, st.st_mtime_ns))
+            else:
+                removed.append(path)
+        self.pending.clear()
+        if added or removed:
+            self.files_changed.emit(added, removed)
+
+    def stop(self):
+        self.timer.stop()
+        if self.inotify_fd is not None:
+            self.notifier.setEnabled(False)
+            os.close(self.inotify_fd)
+            self.inotify_fd = None